@@ -0,0 +1,341 @@
+import pygame
+import os
+import json
+import mmap
+import struct
+import threading
+import numpy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+ASSET_PACK_PATH = os.path.join(os.path.dirname(__file__), ASSET_PACK_FILE)
+
+# パックファイルの形式
+PACK_MAGIC = b"JFPK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sII")  # マジック, バージョン, 目次の長さ
+PACK_ALIGN = 16
+
+def make_transparent_legacy(surface, threshold=230):
+    """白っぽい背景を透明にする（1ピクセルずつ処理する旧実装・比較用）"""
+    surface = surface.copy()
+    width, height = surface.get_size()
+    for x in range(width):
+        for y in range(height):
+            r, g, b, a = surface.get_at((x, y))
+            # 白っぽい（R,G,B全てがしきい値以上）なら透明に
+            if r >= threshold and g >= threshold and b >= threshold:
+                surface.set_at((x, y), (r, g, b, 0))
+    return surface
+
+def make_transparent(surface, threshold=230, feather=0):
+    """白っぽい背景を透明にする（しきい値以上のRGB値を透明化）
+
+    NumPy配列でまとめて処理する。feather > 0 のときは、RGBの最小値が
+    しきい値の手前 feather 段階に入るピクセルのアルファを線形に下げて
+    輪郭をなめらかにする（feather=0 なら旧実装とピクセル単位で一致）。
+    """
+    # ピクセルごとのアルファを持たないSurfaceは旧実装と同じ結果にする
+    if not surface.get_flags() & pygame.SRCALPHA or surface.get_bitsize() != 32:
+        return make_transparent_legacy(surface, threshold)
+
+    surface = surface.copy()
+    rgb = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    # R,G,Bの最小値がしきい値以上 ⇔ 全てがしきい値以上
+    min_rgb = rgb.min(axis=2)
+    if feather > 0:
+        edge = (min_rgb < threshold) & (min_rgb > threshold - feather)
+        scale = (threshold - min_rgb[edge]).astype(numpy.float32) / feather
+        alpha[edge] = (alpha[edge] * scale).astype(numpy.uint8)
+    alpha[min_rgb >= threshold] = 0
+    # 配列の参照を消してSurfaceのロックを解除する
+    del rgb, alpha
+    return surface
+
+class SpriteCache:
+    """画像とマスクをプロセス全体で共有するキャッシュ
+
+    (ファイル名, サイズ, しきい値) をキーにして、読み込み・拡大縮小・透過処理・
+    マスク作成を一度だけ行う。上限を超えたら最も古く使われたものから捨てる（LRU）。
+    返す画像は共有物なので、呼び出し側で描き込まないこと。
+    """
+    def __init__(self, capacity=SPRITE_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.pack = None  # AssetPack があればディスク読み込みの代わりに使う
+        # AssetLoader のスレッドからも呼ばれるので辞書の操作は排他する
+        # （読み込み自体はロックの外。同じキーを二重に読んでも結果は同じ）
+        self.lock = threading.Lock()
+
+    def get(self, filename, size, threshold=230):
+        """(image, mask) を返す。無ければ読み込んでキャッシュする"""
+        key = (filename, tuple(size), threshold)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry
+            self.misses += 1
+
+        entry = None
+        if self.pack is not None:
+            entry = self.pack.sprite(filename, size, threshold)
+        if entry is None:
+            image = pygame.image.load(os.path.join(ASSETS_DIR, filename)).convert_alpha()
+            image = pygame.transform.scale(image, size)
+            image = make_transparent(image, threshold)
+            entry = (image, pygame.mask.from_surface(image))
+
+        with self.lock:
+            self.entries[key] = entry
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+# 全スプライトで共有するキャッシュ
+sprite_cache = SpriteCache()
+
+
+def load_image(filename, size, threshold=230, pack=None):
+    """透過済みの画像を読み込む（共有キャッシュに入れない。AssetStreamer 用）"""
+    if pack is not None:
+        entry = pack.sprite(filename, size, threshold)
+        if entry is not None:
+            return entry[0]
+    image = pygame.image.load(os.path.join(ASSETS_DIR, filename)).convert_alpha()
+    return make_transparent(pygame.transform.scale(image, size), threshold)
+
+def load_sound(path, volume=0.5):
+    """効果音を読み込む。失敗したら None"""
+    try:
+        sound = pygame.mixer.Sound(path)
+        sound.set_volume(volume)
+        return sound
+    except (pygame.error, OSError) as e:
+        print(f"Failed to load sound: {os.path.basename(path)} ({e})")
+        return None
+
+
+class LazyAsset:
+    """バックグラウンドで読み込み中のアセット。get() で完了を待って中身を返す"""
+    def __init__(self, future):
+        self.future = future
+
+    def ready(self):
+        return self.future.done()
+
+    def get(self):
+        return self.future.result()
+
+
+class AssetLoader:
+    """スレッドプールでアセットを読み込み、LazyAsset を返す"""
+    def __init__(self, max_workers=ASSET_LOADER_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+
+    def submit(self, func, *args, **kwargs):
+        return LazyAsset(self.executor.submit(func, *args, **kwargs))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LazyAssetDict(dict):
+    """値が LazyAsset なら、取り出すときにそのアセットだけ読み込み完了を待つ辞書"""
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, LazyAsset):
+            value = value.get()
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def ready(self, key):
+        """key の読み込みが終わっていれば True（待たずに調べる）"""
+        value = super().get(key)
+        return not isinstance(value, LazyAsset) or value.ready()
+
+    def pending(self):
+        """まだ読み込み中の件数"""
+        return sum(1 for value in self.values() if isinstance(value, LazyAsset) and not value.ready())
+
+
+def pack_data_start(index_len):
+    """データ領域の先頭位置（目次の後ろを PACK_ALIGN にそろえる）"""
+    end = PACK_HEADER.size + index_len
+    return end + (-end % PACK_ALIGN)
+
+def sprite_key(filename, size, threshold=230):
+    return f"sprite:{filename}:{size[0]}x{size[1]}:{threshold}"
+
+def background_key(filename, size):
+    return f"bg:{filename}:{size[0]}x{size[1]}"
+
+def load_background(filename, size=(SCREEN_WIDTH, SCREEN_HEIGHT), pack=None):
+    """背景画像を読み込む（パックにあればそちらを使う）"""
+    if pack is not None:
+        surface = pack.surface(background_key(filename, size))
+        if surface is not None:
+            # パックのBGRAのままだと毎フレームの blit が遅いので、画面ができていれば
+            # 画面と同じ形式にしておく（コピーするので mmap からも離れる）
+            if pygame.display.get_surface() is not None:
+                return surface.convert()
+            return surface
+    image = pygame.image.load(os.path.join(ASSETS_DIR, filename)).convert()
+    return pygame.transform.scale(image, size)
+
+
+class AssetPack:
+    """build_asset_pack.py で作ったパックファイルをメモリマップで読む
+
+    画素データは拡大縮小・透過処理済みのBGRAで入っているので、
+    mmap のバッファからそのままSurfaceを作る（コピーしない）。
+    """
+    def __init__(self, path=ASSET_PACK_PATH):
+        self.path = path
+        self.file = open(path, "rb")
+        # ACCESS_COPY: 書き込まれてもファイルは変わらない（書かなければ共有のまま）
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_len = PACK_HEADER.unpack_from(self.map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"unsupported asset pack: {path}")
+        start = PACK_HEADER.size
+        self.index = json.loads(self.map[start:start + index_len].decode("utf-8"))
+        self.data_start = pack_data_start(index_len)
+        self.view = memoryview(self.map)
+
+    def is_stale(self, assets_dir=ASSETS_DIR):
+        """元画像が作成時から変わっていれば True"""
+        for filename, (mtime_ns, size) in self.index["sources"].items():
+            try:
+                stat = os.stat(os.path.join(assets_dir, filename))
+            except OSError:
+                return True
+            if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+                return True
+        return False
+
+    def surface(self, key):
+        entry = self.index["entries"].get(key)
+        if entry is None:
+            return None
+        width, height = entry["size"]
+        offset = self.data_start + entry["offset"]
+        data = self.view[offset:offset + width * height * 4]
+        surface = pygame.image.frombuffer(data, (width, height), "BGRA")
+        if not entry["alpha"]:
+            # 不透明な背景はブレンドなしのコピー転送にする
+            surface.set_alpha(None)
+        return surface
+
+    def mask(self, key):
+        entry = self.index["entries"].get(key)
+        if entry is None or "mask_offset" not in entry:
+            return None
+        mask = pygame.mask.Mask(tuple(entry["size"]))
+        offset = self.data_start + entry["mask_offset"]
+        memoryview(mask).cast("B")[:] = self.view[offset:offset + entry["mask_len"]]
+        return mask
+
+    def sprite(self, filename, size, threshold=230):
+        """(image, mask) を返す。パックに無ければ None"""
+        key = sprite_key(filename, size, threshold)
+        image = self.surface(key)
+        if image is None:
+            return None
+        return image, self.mask(key)
+
+
+def open_asset_pack(path=ASSET_PACK_PATH):
+    """パックが使えれば AssetPack を返す。無い・古い場合は None（個別ファイルを読む）"""
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = AssetPack(path)
+    except (OSError, ValueError) as e:
+        print(f"Failed to open asset pack: {e}")
+        return None
+    if pack.is_stale():
+        print("Asset pack is stale, loading assets/ instead (run build_asset_pack.py)")
+        return None
+    return pack
+
+
+def write_asset_pack(path, sprites, backgrounds, assets_dir=ASSETS_DIR):
+    """パックファイルを書き出す
+
+    sprites: (ファイル名, サイズ, しきい値) のリスト
+    backgrounds: (ファイル名, サイズ) のリスト
+    pygame.display が初期化済みであること。
+    オフセットはデータ領域の先頭からの位置で記録する。
+    """
+    entries = {}
+    blobs = []
+    sources = {}
+    offset = 0
+
+    def add_blob(data):
+        nonlocal offset
+        start = offset
+        padding = -len(data) % PACK_ALIGN
+        blobs.append(data + bytes(padding))
+        offset += len(data) + padding
+        return start
+
+    for filename, size in backgrounds:
+        surface = load_background(filename, size)
+        entries[background_key(filename, size)] = {
+            "size": list(size), "alpha": False,
+            "offset": add_blob(pygame.image.tobytes(surface, "BGRA")),
+        }
+        sources[filename] = None
+    for filename, size, threshold in sprites:
+        image = pygame.image.load(os.path.join(assets_dir, filename)).convert_alpha()
+        image = make_transparent(pygame.transform.scale(image, size), threshold)
+        mask_data = bytes(memoryview(pygame.mask.from_surface(image)).cast("B"))
+        entries[sprite_key(filename, size, threshold)] = {
+            "size": list(size), "alpha": True,
+            "offset": add_blob(pygame.image.tobytes(image, "BGRA")),
+            "mask_offset": add_blob(mask_data), "mask_len": len(mask_data),
+        }
+        sources[filename] = None
+
+    for filename in sources:
+        stat = os.stat(os.path.join(assets_dir, filename))
+        sources[filename] = [stat.st_mtime_ns, stat.st_size]
+
+    index_data = json.dumps({"sources": sources, "entries": entries}).encode("utf-8")
+    data_start = pack_data_start(len(index_data))
+    with open(path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_data)))
+        f.write(index_data)
+        f.write(bytes(data_start - PACK_HEADER.size - len(index_data)))
+        for blob in blobs:
+            f.write(blob)
+    return len(entries)
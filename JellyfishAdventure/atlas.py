@@ -0,0 +1,171 @@
+import pygame
+import numpy
+from settings import *
+from assets import sprite_cache
+
+def alpha_levels(surface):
+    """0 以外のアルファ値の集合（透明か不透明かの2値なら {255}）"""
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return {255}
+    return set(numpy.unique(pygame.surfarray.array_alpha(surface)).tolist()) - {0}
+
+def set_alpha(surface, value):
+    """set_alpha() と同じだが、RLEACCEL を頼んだSurfaceではRLEを外さない"""
+    surface.set_alpha(value, surface.get_flags() & pygame.RLEACCELOK)
+
+
+class AtlasSheet:
+    """1枚のシートに画像を棚詰め（同じ高さの段に左から並べる）する"""
+    def __init__(self, surface, padding):
+        self.surface = surface
+        self.padding = padding
+        self.shelves = []  # [y, 高さ, 次に置くx]
+        self.bottom = 0    # 使った段の下端
+        self.used = 0      # 置いた画像の面積
+
+    def place(self, width, height):
+        """width x height を置ける場所の Rect（空きが無ければ None）"""
+        sheet_width, sheet_height = self.surface.get_size()
+        w, h = width + self.padding, height + self.padding
+        for shelf in self.shelves:
+            # 高さが合う段（高すぎる段は無駄が多いので1.5倍まで）
+            if height <= shelf[1] <= height * 3 // 2 + 1 and shelf[2] + w <= sheet_width:
+                rect = pygame.Rect(shelf[2], shelf[0], width, height)
+                shelf[2] += w
+                break
+        else:
+            if self.bottom + h > sheet_height or w > sheet_width:
+                return None
+            self.shelves.append([self.bottom, h, w])
+            rect = pygame.Rect(0, self.bottom, width, height)
+            self.bottom += h
+        self.used += width * height
+        return rect
+
+
+class TextureAtlas:
+    """小さな画像を数枚のシート（sheet_size 四方）にまとめ、サブサーフェスで配る
+
+    colorkey を渡すと、シートをピクセルごとのアルファを持たない画面と同じ形式にして、
+    透明な画素をその色で塗る。配るサブサーフェスはカラーキーと RLEACCEL 付きで、
+    アルファ付きのままより速く描ける（透明が0か255の2値の画像、または不透明な部分が
+    全部同じアルファの画像だけ。同じアルファは Surface 全体のアルファにする）。
+    colorkey=None ならシートは convert_alpha() 形式で、中身はそのままコピーする。
+    ディスプレイの形式に合わせるので、画面を作ってから使うこと。
+    """
+    def __init__(self, sheet_size=ATLAS_SHEET_SIZE, colorkey=None, padding=ATLAS_PADDING):
+        self.sheet_size = sheet_size
+        self.colorkey = colorkey
+        self.padding = padding
+        self.sheets = []
+
+    def new_sheet(self):
+        size = (self.sheet_size, self.sheet_size)
+        if self.colorkey is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface(size).convert()
+            surface.fill(self.colorkey)
+        sheet = AtlasSheet(surface, self.padding)
+        self.sheets.append(sheet)
+        return sheet
+
+    def add(self, image, alpha=255):
+        """image をシートに写してサブサーフェスを返す（シートに入らない大きさならそのまま）
+
+        カラーキーのアトラスでは alpha が不透明な部分のアルファ（alpha_levels の値）。
+        """
+        width, height = image.get_size()
+        for sheet in self.sheets:
+            rect = sheet.place(width, height)
+            if rect is not None:
+                break
+        else:
+            sheet = self.new_sheet()
+            rect = sheet.place(width, height)
+            if rect is None:
+                return image
+
+        if self.colorkey is None:
+            sheet.surface.blit(image, rect, special_flags=pygame.BLEND_RGBA_MAX)
+            return sheet.surface.subsurface(rect)
+
+        # 透明な画素をカラーキーで塗る（不透明な画素がカラーキーと同じ色なら少しずらす）
+        rgb = pygame.surfarray.array3d(image)
+        opaque = pygame.surfarray.array_alpha(image) > 0 if image.get_flags() & pygame.SRCALPHA else numpy.ones(rgb.shape[:2], bool)
+        key = numpy.array(self.colorkey[:3], dtype=rgb.dtype)
+        clash = opaque & (rgb == key).all(axis=2)
+        rgb[clash] = numpy.where(key > 0, key - 1, key + 1)
+        rgb[~opaque] = key
+        pixels = pygame.surfarray.pixels3d(sheet.surface)
+        pixels[rect.left:rect.right, rect.top:rect.bottom] = rgb
+        del pixels
+
+        sub = sheet.surface.subsurface(rect)
+        sub.set_colorkey(self.colorkey, pygame.RLEACCEL)
+        if alpha < 255:
+            sub.set_alpha(alpha, pygame.RLEACCEL)
+        return sub
+
+    def stats(self):
+        area = self.sheet_size * self.sheet_size
+        return {
+            'sheets': len(self.sheets),
+            'sheet_size': self.sheet_size,
+            'fill': [sheet.used / area for sheet in self.sheets],
+        }
+
+
+class SpriteAtlas:
+    """スプライト用の画像をアトラスから配る（sprites.py と particles.py が使う）
+
+    mode='alpha' : これまでどおり sprite_cache の画像をそのまま使う
+    mode='atlas' : アルファ付きのシートにまとめたサブサーフェス
+    mode='rle'   : 2値の透明（と一様な半透明）の画像はカラーキー+RLEのシート、
+                   それ以外はアルファ付きのシートにまとめる
+    マスクは元のアルファ付き画像から作ったもの（sprite_cache と同じ）。
+    スプライトを作るメインスレッドから使う。
+    """
+    def __init__(self, mode=SPRITE_ATLAS_MODE, sheet_size=ATLAS_SHEET_SIZE):
+        self.mode = mode
+        self.alpha_atlas = TextureAtlas(sheet_size)
+        self.colorkey_atlas = TextureAtlas(sheet_size, colorkey=ATLAS_COLORKEY)
+        self.images = {}  # キー -> 配ったSurface
+
+    def get(self, filename, size, threshold=230):
+        """sprite_cache.get() と同じ (image, mask) を返す"""
+        image, mask = sprite_cache.get(filename, size, threshold)
+        return self.add((filename, tuple(size), threshold), image), mask
+
+    def add(self, key, image):
+        """image をアトラスに入れて返す（同じ key は2回目から同じSurface）"""
+        packed = self.images.get(key)
+        if packed is not None:
+            return packed
+        if self.mode == 'alpha' or pygame.display.get_surface() is None:
+            return image
+
+        levels = alpha_levels(image)
+        if self.mode == 'rle' and len(levels) <= 1:
+            packed = self.colorkey_atlas.add(image, alpha=min(levels, default=255))
+        else:
+            packed = self.alpha_atlas.add(image)
+        self.images[key] = packed
+        return packed
+
+    def clear(self):
+        self.alpha_atlas = TextureAtlas(self.alpha_atlas.sheet_size)
+        self.colorkey_atlas = TextureAtlas(self.colorkey_atlas.sheet_size, colorkey=ATLAS_COLORKEY)
+        self.images = {}
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'images': len(self.images),
+            'alpha': self.alpha_atlas.stats(),
+            'colorkey': self.colorkey_atlas.stats(),
+        }
+
+# スプライトで共有するアトラス
+sprite_atlas = SpriteAtlas()
@@ -0,0 +1,114 @@
+import os
+import pygame
+from collections import Counter
+from settings import *
+from assets import load_sound, LazyAssetDict
+import sim
+
+SOUNDS_DIR = os.path.join(os.path.dirname(__file__), "assets", "sounds")
+
+class SoundManager:
+    """効果音とBGMの再生をまとめて管理する
+
+    ミキサーのチャンネルを種類（SOUND_CHANNELS）ごとに取っておき、効果音は
+    自分の種類のチャンネルでだけ鳴らす。よく鳴るダッシュ音がチャンネルを
+    使い切っても、当たった音やクリア音が鳴らなくなることはない。
+    効果音ごとに同時に鳴らす数の上限と、鳴らし直すまでの最短間隔を決めて
+    （SOUND_EFFECTS）、それを超える分は鳴らさずに数えておく。
+    音声ファイルは AssetLoader で裏で読み込み、読み終わるまでは鳴らさない（待たない）。
+    """
+    def __init__(self, loader=None, enabled=True, effects=SOUND_EFFECTS, channels=SOUND_CHANNELS):
+        self.enabled = enabled
+        self.effects = effects
+        self.sounds = LazyAssetDict()
+        self.channels = {}        # 種類 -> [Channel, ...]
+        self.last_played = {}     # 効果音 -> 最後に鳴らした時刻（ゲーム内の時刻 sim.get_ticks()、ms）
+        self.played = Counter()   # 効果音 -> 鳴らした回数
+        self.dropped = Counter()  # (効果音, 理由) -> 鳴らさなかった回数
+        if not enabled:
+            return
+
+        # 種類ごとのチャンネルを先頭から割り当て、Sound.play() が勝手に使わないよう予約する
+        total = sum(channels.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+        pygame.mixer.set_reserved(total)
+        index = 0
+        for category, count in channels.items():
+            self.channels[category] = [pygame.mixer.Channel(i) for i in range(index, index + count)]
+            index += count
+
+        for name, (filename, *_) in effects.items():
+            path = os.path.join(SOUNDS_DIR, filename)
+            if os.path.exists(path):
+                if loader is not None:
+                    self.sounds[name] = loader.submit(load_sound, path)
+                else:
+                    self.sounds[name] = load_sound(path)
+
+    def play(self, name):
+        """効果音を鳴らす。鳴らしたチャンネルを返す（鳴らさなかったら None）"""
+        if not self.enabled or name not in self.sounds:
+            return None
+        if not self.sounds.ready(name):
+            self.dropped[(name, 'loading')] += 1
+            return None
+        sound = self.sounds[name]
+        if sound is None:
+            return None
+
+        _, category, max_voices, cooldown = self.effects[name]
+        # 間隔はゲーム内の時刻で測る（ヘッドレス・リプレイでも同じフレームで同じ結果になる）
+        now = sim.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < cooldown:
+            self.dropped[(name, 'cooldown')] += 1
+            return None
+
+        free = None
+        voices = 0
+        for channel in self.channels[category]:
+            if not channel.get_busy():
+                if free is None:
+                    free = channel
+            elif channel.get_sound() is sound:
+                voices += 1
+        if voices >= max_voices:
+            self.dropped[(name, 'voices')] += 1
+            return None
+        if free is None:
+            self.dropped[(name, 'channels')] += 1
+            return None
+
+        free.play(sound)
+        self.last_played[name] = now
+        self.played[name] += 1
+        return free
+
+    def play_music(self, filename, volume=0.4):
+        """BGMをループ再生する（ミキサーの music は効果音のチャンネルとは別）"""
+        if not self.enabled:
+            return
+        path = os.path.join(SOUNDS_DIR, filename)
+        if os.path.exists(path):
+            try:
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.set_volume(volume)
+                pygame.mixer.music.play(-1) # ループ再生
+            except (pygame.error, OSError) as e:
+                print(f"Failed to load BGM: {filename} ({e})")
+
+    def voices(self):
+        """種類ごとの鳴っているチャンネル数"""
+        return {category: sum(channel.get_busy() for channel in channels)
+                for category, channels in self.channels.items()}
+
+    def stats(self):
+        dropped = Counter()
+        for (name, reason), count in self.dropped.items():
+            dropped[reason] += count
+        return {
+            'voices': self.voices(),
+            'played': dict(self.played),
+            'dropped': dict(dropped),
+            'dropped_by_sound': {f"{name}:{reason}": count for (name, reason), count in self.dropped.items()},
+        }
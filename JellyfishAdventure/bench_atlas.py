@@ -0,0 +1,94 @@
+"""スプライトの描き方（SpriteAtlas のモード）ごとの blit 速度を比べるベンチマーク
+
+ゲームと同じ大きさのクラゲ・障害物・泡の画像を、次の3通りに用意して
+画面と同じ形式のSurfaceにランダムな位置で描く時間を測る。
+  alpha : sprite_cache の convert_alpha() 画像をそのまま（これまでの描き方）
+  atlas : アルファ付きのシートにまとめたサブサーフェス
+  rle   : 2値・一様な半透明の画像はカラーキー+RLEのシート
+描いた結果が alpha とどれだけ違うか（画素値の差の最大）も表示する。
+
+使い方: python bench_atlas.py [スプライト数] [繰り返し回数]
+"""
+import os
+import sys
+import time
+
+# 画面なしでも convert できるようにダミードライバを使う
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy
+import pygame
+from settings import *
+from atlas import SpriteAtlas
+
+# ゲーム内で使うスプライト画像とサイズ
+SPRITE_ART = [
+    ("jellyfish_normal.png", (60, 60)),
+    ("jellyfish_hit.png", (60, 60)),
+    ("seaweed.png", (30, 120)),
+    ("sunfish.png", (70, 70)),
+    ("turtle.png", (120, 100)),
+    ("plastic_waste.png", (60, 60)),
+]
+BUBBLE_RADII = range(1, 9)
+
+def bubble(radius):
+    """ParticleSystem と同じ泡の画像"""
+    image = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(image, (255, 255, 255, 150), (radius, radius), radius)
+    return image
+
+def load_images(mode):
+    atlas = SpriteAtlas(mode)
+    sprites = [atlas.get(filename, size)[0] for filename, size in SPRITE_ART]
+    bubbles = [atlas.add(('bubble', r), bubble(r)) for r in BUBBLE_RADII]
+    return sprites, bubbles, atlas
+
+def time_blits(screen, background, batch, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        screen.blit(background, (0, 0))
+        start = time.perf_counter()
+        screen.blits(batch, doreturn=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background = pygame.image.load(os.path.join(os.path.dirname(__file__), "assets", "sea3.jpg")).convert()
+    background = pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    rng = numpy.random.default_rng(0)
+    positions = list(zip(rng.integers(-20, SCREEN_WIDTH, count).tolist(), rng.integers(-20, SCREEN_HEIGHT, count).tolist()))
+    picks = rng.integers(0, 1 << 16, count).tolist()
+
+    reference = {}
+    results = {}
+    print(f"{count} blits per frame, best of {repeat}")
+    print(f"{'mode':6} {'sprites ms':>10} {'bubbles ms':>10} {'speedup':>8} {'max diff':>9}  sheets")
+    for mode in ('alpha', 'atlas', 'rle'):
+        sprites, bubbles, atlas = load_images(mode)
+        timings = []
+        diff = 0
+        for name, images in (('sprites', sprites), ('bubbles', bubbles)):
+            batch = [(images[pick % len(images)], pos) for pick, pos in zip(picks, positions)]
+            timings.append(time_blits(screen, background, batch, repeat))
+            # 同じ位置に描いた結果を alpha と比べる
+            frame = pygame.surfarray.array3d(screen).astype(numpy.int16)
+            if mode == 'alpha':
+                reference[name] = frame
+            else:
+                diff = max(diff, int(numpy.abs(frame - reference[name]).max()))
+        results[mode] = timings
+        base = results['alpha']
+        speedup = (base[0] + base[1]) / (timings[0] + timings[1])
+        stats = atlas.stats()
+        sheets = f"alpha {stats['alpha']['sheets']}, colorkey {stats['colorkey']['sheets']}"
+        print(f"{mode:6} {timings[0] * 1000:10.3f} {timings[1] * 1000:10.3f} {speedup:7.2f}x {diff:9}  {sheets}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""当たり判定の比較: spritecollide（全障害物をマスク判定）と SpatialGroup（グリッドで絞り込み）
+
+障害物の数を増やしながら、1フレーム分の判定にかかる時間と判定回数を測る。
+結果が spritecollide と一致するかも確認する。
+dense: 全部画面内に置く（密度が上がるので候補数も増える）
+spread: 障害物1体あたりの面積を一定にして広い範囲に置く（画面外に溜まっていく状況）
+
+使い方: python bench_collision.py [フレーム数]
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from settings import *
+from sprites import Jellyfish, Seaweed, Sunfish, Turtle, PlasticWaste
+from collision import SpatialGroup
+
+OBSTACLE_COUNTS = [10, 50, 200, 800, 3200]
+
+def make_obstacles(count, player, rng, scale=1.0):
+    obstacles = []
+    width, height = int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale)
+    for _ in range(count):
+        pos = (rng.randint(0, width), rng.randint(0, height))
+        kind = rng.choice([Seaweed, Sunfish, Turtle, PlasticWaste])
+        obstacles.append(kind(pos, player) if kind is Sunfish else kind(pos))
+    return obstacles
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(0)
+
+    for layout in ("dense", "spread"):
+        print(layout)
+        run_layout(layout, frames, rng)
+    pygame.quit()
+
+def run_layout(layout, frames, rng):
+    print(f"{'obstacles':>9} {'spritecollide us':>16} {'grid us':>8} {'candidates':>10} {'mask tests':>10}  match")
+    for count in OBSTACLE_COUNTS:
+        player = Jellyfish((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        scale = 1.0 if layout == "dense" else max(1.0, (count / OBSTACLE_COUNTS[0]) ** 0.5)
+        obstacles = make_obstacles(count, player, rng, scale)
+        plain = pygame.sprite.Group(obstacles)
+        grid = SpatialGroup(obstacles)
+        # プレイヤーを画面内のいろいろな位置に置いて測る
+        positions = [(rng.randint(30, SCREEN_WIDTH - 30), rng.randint(30, SCREEN_HEIGHT - 30)) for _ in range(frames)]
+
+        match = True
+        start = time.perf_counter()
+        expected = []
+        for pos in positions:
+            player.rect.center = pos
+            expected.append(pygame.sprite.spritecollide(player, plain, False, pygame.sprite.collide_mask))
+        plain_time = time.perf_counter() - start
+
+        candidates = 0
+        mask_tests = 0
+        start = time.perf_counter()
+        for i, pos in enumerate(positions):
+            player.rect.center = pos
+            hits = grid.collide(player, pygame.sprite.collide_mask)
+            candidates += grid.candidates
+            mask_tests += grid.mask_tests
+            match = match and hits == expected[i]
+        grid_time = time.perf_counter() - start
+
+        print(f"{count:>9} {plain_time / frames * 1e6:16.1f} {grid_time / frames * 1e6:8.1f} "
+              f"{candidates / frames:10.1f} {mask_tests / frames:10.1f}  {'OK' if match else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""障害物プールの耐久テスト（ソーク）
+
+ヘッドレスでステージ2〜5を何周も続けて遊び（各ステージ STAGE_FRAMES フレーム、
+プレイヤーは画面中央に固定）、プールあり・なしで次を比べる。
+  - 障害物を新しく作った数（1フレームあたり。最初の1周はウォームアップとして除く）
+  - GCの回数と停止時間（合計・最大）
+  - 1フレームの間に一時的に確保したメモリの最大（tracemalloc。計測が重いので別の1周で測る）
+  - 各プールの上限・同時使用数の最大（high water）
+プールで減るのは障害物を作る数で、1フレームの一時メモリはプールあり・なしでほぼ同じ
+（残りは泡の NumPy 計算の呼び出しごとのビューや型変換のバッファで、障害物の数によらない）。
+最後に両方を並べ、プールありの方が障害物を作る数・GCの回数が多いか、プールありの
+一時メモリが POOLED_ALLOC_MEAN_KIB / POOLED_ALLOC_MAX_KIB を超えたら FAIL で終了コード1にする。
+
+使い方: python bench_pool.py [周回数]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import *
+import sim
+import game as game_module
+from sprites import Obstacle
+from scenes import PlayScene
+
+STAGES = [2, 3, 4, 5]
+STAGE_FRAMES = FPS * 20
+# プールありで許す1フレームの一時メモリ（KiB。測ったときは平均 1.8、最大 7.1）
+POOLED_ALLOC_MEAN_KIB = 2.5
+POOLED_ALLOC_MAX_KIB = 10
+
+class GCTimer:
+    """gc.callbacks で各世代のGC回数と停止時間を集める"""
+    def __init__(self):
+        self.collections = Counter()
+        self.pauses = []
+        self.start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.start = time.perf_counter()
+        elif self.start is not None:
+            self.pauses.append(time.perf_counter() - self.start)
+            self.collections[info["generation"]] += 1
+            self.start = None
+
+def count_constructions(counter):
+    """Obstacle.__init__ が呼ばれた回数を種類ごとに数える"""
+    original = Obstacle.__init__
+    def counting_init(self, *args, **kwargs):
+        counter[type(self).__name__] += 1
+        original(self, *args, **kwargs)
+    Obstacle.__init__ = counting_init
+    return original
+
+class AllocationTracker:
+    """tracemalloc で1フレームごとの一時的な確保量（フレーム中の最大 − 開始時）を集める"""
+    def __init__(self):
+        self.peaks = []
+
+    def begin_frame(self):
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        self.peaks.append(tracemalloc.get_traced_memory()[1] - self.base)
+
+def play_stage(game, stage, allocations=None):
+    game.clear_sprites()
+    game.stage = stage
+    game.new_game()
+    game.player.hp = 10 ** 9
+    for _ in range(STAGE_FRAMES):
+        if allocations is not None:
+            allocations.begin_frame()
+        game.clock.tick(FPS)
+        game.frame += 1
+        game.player.pos.update(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        game.player.vel.update(0, 0)
+        game.update()
+        if allocations is not None:
+            allocations.end_frame()
+
+def soak(use_pools, laps):
+    game_module.USE_SPRITE_POOLS = use_pools
+    game = game_module.Game(headless=True, seed=0, controls=sim.ScriptedInput([]), render=False)
+    game.change_scene(PlayScene(game))
+
+    constructed = Counter()
+    original_init = count_constructions(constructed)
+    try:
+        # 1周目はウォームアップ（プールが育つまで）
+        for stage in STAGES:
+            play_stage(game, stage)
+        constructed.clear()
+
+        timer = GCTimer()
+        gc.callbacks.append(timer)
+        try:
+            for _ in range(laps):
+                for stage in STAGES:
+                    play_stage(game, stage)
+        finally:
+            gc.callbacks.remove(timer)
+    finally:
+        Obstacle.__init__ = original_init
+
+    # 確保量は別の1周で測る（tracemalloc を付けるとGCの時間が変わるため）
+    allocations = AllocationTracker()
+    tracemalloc.start()
+    try:
+        for stage in STAGES:
+            play_stage(game, stage, allocations)
+    finally:
+        tracemalloc.stop()
+
+    frames = laps * len(STAGES) * STAGE_FRAMES
+    game.loader.shutdown()
+    return {
+        'frames': frames,
+        'constructed': constructed,
+        'gc_collections': sum(timer.collections.values()),
+        'gc_by_generation': timer.collections,
+        'gc_pause_total': sum(timer.pauses),
+        'gc_pause_max': max(timer.pauses, default=0),
+        'alloc_mean': sum(allocations.peaks) / len(allocations.peaks),
+        'alloc_max': max(allocations.peaks),
+        'pools': game.pools,
+    }
+
+def main():
+    laps = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    results = {}
+    for use_pools in (False, True):
+        result = results[use_pools] = soak(use_pools, laps)
+        frames, constructed = result['frames'], result['constructed']
+        total = sum(constructed.values())
+        print(f"pools={'on' if use_pools else 'off'}  {frames} frames")
+        print(f"  obstacles constructed: {total} ({total / frames:.4f}/frame)  "
+              + ", ".join(f"{name} {count}" for name, count in sorted(constructed.items())))
+        collections = result['gc_by_generation']
+        print(f"  gc collections: gen0 {collections[0]}, gen1 {collections[1]}, gen2 {collections[2]}"
+              f"  total pause {result['gc_pause_total'] * 1000:.3f} ms, max pause {result['gc_pause_max'] * 1000:.3f} ms")
+        print(f"  allocated per frame: mean {result['alloc_mean'] / 1024:.1f} KiB, max {result['alloc_max'] / 1024:.1f} KiB")
+        if use_pools:
+            for name, stats in result['pools'].stats().items():
+                print(f"  {name:13} capacity {stats['capacity']}, high water {stats['high_water']}, "
+                      f"created {stats['created']}, reused {stats['reused']}, free {stats['free']}")
+    pygame.quit()
+
+    off, on = results[False], results[True]
+    rows = [
+        ("obstacles constructed", sum(off['constructed'].values()), sum(on['constructed'].values()), "{}"),
+        ("gc collections", off['gc_collections'], on['gc_collections'], "{}"),
+        ("gc pause total (ms)", off['gc_pause_total'] * 1000, on['gc_pause_total'] * 1000, "{:.3f}"),
+        ("gc pause max (ms)", off['gc_pause_max'] * 1000, on['gc_pause_max'] * 1000, "{:.3f}"),
+        ("alloc/frame mean (KiB)", off['alloc_mean'] / 1024, on['alloc_mean'] / 1024, "{:.1f}"),
+        ("alloc/frame max (KiB)", off['alloc_max'] / 1024, on['alloc_max'] / 1024, "{:.1f}"),
+    ]
+    print(f"{'':24} {'off':>10} {'on':>10}")
+    for label, before, after, fmt in rows:
+        print(f"{label:24} {fmt.format(before):>10} {fmt.format(after):>10}")
+
+    # 時間は揺れるので、判定は回数と確保量だけで行う
+    failures = []
+    if sum(on['constructed'].values()) >= max(sum(off['constructed'].values()), 1):
+        failures.append("pools did not reduce obstacle constructions")
+    if on['gc_collections'] > off['gc_collections']:
+        failures.append("pools increased gc collections")
+    if on['alloc_mean'] > POOLED_ALLOC_MEAN_KIB * 1024:
+        failures.append(f"pooled alloc/frame mean {on['alloc_mean'] / 1024:.1f} KiB > {POOLED_ALLOC_MEAN_KIB} KiB")
+    if on['alloc_max'] > POOLED_ALLOC_MAX_KIB * 1024:
+        failures.append(f"pooled alloc/frame max {on['alloc_max'] / 1024:.1f} KiB > {POOLED_ALLOC_MAX_KIB} KiB")
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("ok")
+
+if __name__ == "__main__":
+    main()
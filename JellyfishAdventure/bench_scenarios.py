@@ -0,0 +1,220 @@
+"""シナリオ別の性能ベンチマーク
+
+実際のクラスで場面を組み立て、Game.update と Game.draw の時間を別々に測る
+（ヘッドレス・オフスクリーン描画）。フレーム時間の平均・p50・p99・最大と、
+ピークメモリ（Pythonの確保量とプロセスの最大RSS）をJSONに出力する。
+シナリオごとに新しいプロセスで実行するので、メモリはシナリオ単位の値になる。
+
+使い方:
+    python bench_scenarios.py [--frames N] [--out result.json] [シナリオ名 ...]
+    python bench_scenarios.py --compare before.json after.json
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pygame
+from settings import *
+import sim
+from sprites import Sunfish
+from scenes import PlayScene
+
+WARMUP_FRAMES = 30
+
+def make_game(seed=0):
+    from game import Game
+    game = Game(headless=True, seed=seed, controls=sim.ScriptedInput([]))
+    return game
+
+def start_stage(game, stage):
+    game.change_scene(PlayScene(game))
+    game.stage = stage
+    game.new_game()
+    game.tutorial_active = False
+    # 測定中に終わらないように体力を増やしておく
+    game.player.hp = 10 ** 9
+
+def hold_player(game):
+    """プレイヤーを画面中央に留める（クリア判定で場面が変わらないように）"""
+    game.player.pos.update(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    game.player.vel.update(0, 0)
+
+def scenario_empty_stage():
+    """障害物なしのステージ2"""
+    game = make_game()
+    start_stage(game, 2)
+    game.clear_sprites()
+    game.all_sprites.add(game.player)
+    game.timeline.stop()  # 出現させない
+    return game, hold_player
+
+def scenario_stage5_5min():
+    """ステージ5で最短500ms間隔の出現が5分続いた後"""
+    game = make_game()
+    start_stage(game, 5)
+    # 5分ぶんのフレームを、描画と当たり判定を省いて進める
+    for _ in range(5 * 60 * FPS):
+        game.clock.tick(FPS)
+        hold_player(game)
+        game.update_sprites()
+        game.spawn_obstacle()
+    return game, hold_player
+
+def scenario_bubble_storm():
+    """ダッシュし続けて泡が出続ける状態"""
+    game = make_game()
+    start_stage(game, 2)
+    game.timeline.stop()
+
+    def dash(game):
+        hold_player(game)
+        game.player.vel.update(DASH_POWER_MAX, 0)
+        # 泡をまとめて出して、常に大量に残っている状態にする
+        game.particles.emit(game.player.rect.center, count=60, speed=(1, 5), radius=(2, 8), spread=200)
+    return game, dash
+
+def scenario_sunfish_200():
+    """マンボウ200匹がプレイヤーを追いかける（普段の OBSTACLE_BUDGET を大きく超える負荷試験）"""
+    game = make_game()
+    start_stage(game, 2)
+    game.timeline.stop()
+    rng = sim.rng('bench')
+    for _ in range(200):
+        pos = (rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT))
+        sunfish = Sunfish(pos, game.player)
+        game.add_obstacle(sunfish)
+    return game, hold_player
+
+SCENARIOS = {
+    'empty_stage': scenario_empty_stage,
+    'stage5_5min': scenario_stage5_5min,
+    'bubble_storm': scenario_bubble_storm,
+    'sunfish_200': scenario_sunfish_200,
+}
+
+def step(game, hook):
+    game.clock.tick(FPS)
+    game.frame += 1
+    game.controls.update(game.frame)
+    game.events()
+    hook(game)
+    start = time.perf_counter()
+    game.update()
+    middle = time.perf_counter()
+    game.draw()
+    end = time.perf_counter()
+    return middle - start, end - middle
+
+def summarize(samples):
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+    return {
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+def run_scenario(name, frames):
+    """新しいプロセスの中で1シナリオを測る"""
+    game, hook = SCENARIOS[name]()
+    for _ in range(WARMUP_FRAMES):
+        step(game, hook)
+
+    update_times = []
+    draw_times = []
+    for _ in range(frames):
+        update_time, draw_time = step(game, hook)
+        update_times.append(update_time)
+        draw_times.append(draw_time)
+
+    # メモリは時間測定とは別に測る（tracemalloc は遅くなるため）
+    tracemalloc.start()
+    for _ in range(min(frames, 120)):
+        step(game, hook)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    frame_times = [u + d for u, d in zip(update_times, draw_times)]
+    result = {
+        'frames': frames,
+        'obstacles': len(game.obstacles),
+        'particles': len(game.particles),
+        'update': summarize(update_times),
+        'draw': summarize(draw_times),
+        'frame': summarize(frame_times),
+        'python_peak_kb': peak / 1024,
+        # Linux は KB 単位、macOS はバイト単位
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == "darwin" else 1),
+    }
+    game.loader.shutdown()
+    pygame.quit()
+    return name, result
+
+def print_results(results):
+    print(f"{'scenario':14} {'objs':>5} {'phase':6} {'mean':>7} {'p50':>7} {'p99':>7} {'max':>7}  (ms)")
+    for name, result in results.items():
+        for phase in ('update', 'draw', 'frame'):
+            stats = result[phase]
+            label = name if phase == 'update' else ""
+            count = str(result['obstacles'] + result['particles']) if phase == 'update' else ""
+            print(f"{label:14} {count:>5} {phase:6} {stats['mean_ms']:7.3f} {stats['p50_ms']:7.3f} "
+                  f"{stats['p99_ms']:7.3f} {stats['max_ms']:7.3f}")
+        print(f"{'':14} {'':>5} memory python peak {result['python_peak_kb']:.0f} KiB, max RSS {result['max_rss_kb'] / 1024:.0f} MiB")
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)['scenarios']
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)['scenarios']
+    print(f"{'scenario':14} {'metric':14} {'before':>9} {'after':>9} {'change':>8}")
+    for name in before:
+        if name not in after:
+            continue
+        for phase in ('update', 'draw', 'frame'):
+            for metric in ('mean_ms', 'p99_ms'):
+                old, new = before[name][phase][metric], after[name][phase][metric]
+                change = (new - old) / old * 100 if old else 0.0
+                print(f"{name:14} {phase + ' ' + metric[:-3]:14} {old:9.3f} {new:9.3f} {change:+7.1f}%")
+        old, new = before[name]['max_rss_kb'] / 1024, after[name]['max_rss_kb'] / 1024
+        print(f"{name:14} {'max RSS MiB':14} {old:9.1f} {new:9.1f} {(new - old) / old * 100:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="シナリオ別の性能ベンチマーク")
+    parser.add_argument("scenarios", nargs="*", help=f"実行するシナリオ（省略時は全部: {', '.join(SCENARIOS)}）")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--out", help="結果を書き出すJSONファイル")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="2つの結果JSONを比べる")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+
+    # シナリオごとに新しいプロセスで測る（メモリ・キャッシュの影響を分ける）
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name in names:
+            name, result = pool.apply(run_scenario, (name, args.frames))
+            results[name] = result
+
+    print_results(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'scenarios': results}, f, indent=2)
+        print(f"-> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""起動時のアセット読み込み時間を、パック使用時と個別ファイル読み込み時で比較する
+
+Game() はアセットを AssetStreamer で後から読むので、Game() の時間には画像の読み込みが入らない。
+そこで毎回新しいプロセスで画面を作り、build_asset_pack.py がパックに入れるのと同じ
+スプライト（マスク込み、sprite_cache 経由）と背景（load_background）を直接読んで測る。
+1回目を cold（プロセス初回・OSのファイルキャッシュ次第）、2回目以降の中央値を warm とする。
+OSのページキャッシュは消さないので、本当のコールドスタートより速く出ることがある。
+読んだ背景を画面に blit する1枚あたりの時間も出す（画面と同じ形式になっていないと遅い）。
+
+使い方: python bench_startup.py [繰り返し回数]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import os, sys, time, json
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+import pygame
+from settings import *
+from assets import sprite_cache, open_asset_pack, load_background
+from build_asset_pack import PACK_SPRITES, PACK_BACKGROUNDS
+pygame.init()
+screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+start = time.perf_counter()
+pack = open_asset_pack() if {use_pack} else None
+sprite_cache.pack = pack
+opened = time.perf_counter()
+for filename, size, threshold in PACK_SPRITES:
+    sprite_cache.get(filename, size, threshold)
+sprites = time.perf_counter()
+backgrounds = [load_background(filename, size, pack=pack) for filename, size in PACK_BACKGROUNDS]
+loaded = time.perf_counter()
+for _ in range({blit_repeat}):
+    for background in backgrounds:
+        screen.blit(background, (0, 0))
+blit = (time.perf_counter() - loaded) / ({blit_repeat} * len(backgrounds))
+print(json.dumps(dict(total=loaded - start, open=opened - start, sprites=sprites - opened,
+                      backgrounds=loaded - sprites, blit=blit, used_pack=pack is not None)))
+"""
+
+BLIT_REPEAT = 50
+
+def measure(use_pack, runs):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD.format(use_pack=use_pack, blit_repeat=BLIT_REPEAT)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.splitlines()
+        results.append(json.loads(out[-1]))
+    return results
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'path':8} {'cold ms':>9} {'warm ms':>9} {'open':>7} {'sprites':>8} {'bgs':>7} {'bg blit':>8}")
+    for label, use_pack in (("loose", False), ("pack", True)):
+        results = measure(use_pack, runs)
+        if use_pack and not results[-1]["used_pack"]:
+            print("pack     (assets.pack が無いか古いので個別ファイルを読みました。build_asset_pack.py を実行してください)")
+            continue
+        warm = results[1:] or results
+        median = lambda key: statistics.median(r[key] for r in warm) * 1000
+        print(f"{label:8} {results[0]['total'] * 1000:9.1f} {median('total'):9.1f} {median('open'):7.1f}"
+              f" {median('sprites'):8.1f} {median('backgrounds'):7.1f} {median('blit'):8.3f}")
+
+if __name__ == "__main__":
+    main()
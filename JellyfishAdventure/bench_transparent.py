@@ -0,0 +1,71 @@
+"""make_transparent の旧実装とNumPy実装を実際のアセットサイズで比較するベンチマーク
+
+使い方: python bench_transparent.py [繰り返し回数]
+"""
+import os
+import sys
+import time
+
+# 画面なしでも convert_alpha できるようにダミードライバを使う
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from assets import make_transparent, make_transparent_legacy
+
+# ゲーム内で make_transparent に渡している画像とサイズ
+ASSET_SIZES = [
+    ("jellyfish_normal.png", (60, 60)),
+    ("jellyfish_hit.png", (60, 60)),
+    ("seaweed.png", (30, 120)),
+    ("sunfish.png", (70, 70)),
+    ("turtle.png", (120, 100)),
+    ("plastic_waste.png", (60, 60)),
+    ("jellyfish_normal.png", (200, 200)),
+    ("seaweed.png", (150, 150)),
+    ("sunfish.png", (150, 150)),
+    ("turtle.png", (150, 150)),
+    ("plastic_waste.png", (150, 150)),
+    ("jellyfish_seaweed.jpg", (500, 400)),
+    ("jellyfish_plastic_waste.jpg", (500, 400)),
+    ("jellyfish_turtle.jpg", (500, 400)),
+    ("jellyfish_sunfish.jpg", (500, 400)),
+]
+
+def best_time(func, surface, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(surface)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    assets_dir = os.path.join(os.path.dirname(__file__), "assets")
+
+    total_legacy = 0.0
+    total_numpy = 0.0
+    print(f"{'asset':32} {'size':>9} {'legacy ms':>10} {'numpy ms':>9} {'speedup':>8}  match")
+    for filename, size in ASSET_SIZES:
+        img = pygame.image.load(os.path.join(assets_dir, filename)).convert_alpha()
+        img = pygame.transform.scale(img, size)
+
+        # ピクセル単位で結果が一致するか確認
+        expected = make_transparent_legacy(img)
+        actual = make_transparent(img)
+        match = pygame.image.tobytes(expected, "RGBA") == pygame.image.tobytes(actual, "RGBA")
+
+        legacy = best_time(make_transparent_legacy, img, repeat)
+        vectorized = best_time(make_transparent, img, repeat)
+        total_legacy += legacy
+        total_numpy += vectorized
+        print(f"{filename:32} {size[0]:>4}x{size[1]:<4} {legacy * 1000:10.2f} {vectorized * 1000:9.3f} "
+              f"{legacy / vectorized:7.0f}x  {'OK' if match else 'MISMATCH'}")
+
+    print(f"{'total':42} {total_legacy * 1000:10.2f} {total_numpy * 1000:9.3f} {total_legacy / total_numpy:7.0f}x")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""assets/ の画像を前処理して assets.pack に書き出す
+
+拡大縮小・白背景の透過・当たり判定マスクの作成を済ませた状態で保存するので、
+ゲーム起動時はメモリマップしてそのまま使える。
+画像を差し替えたら作り直すこと（古いパックは自動的に無視される）。
+水中の光の揺らぎの模様（CAUSTICS_QUALITY の品質）も計算して caustics_*.npy に保存する。
+
+使い方: python build_asset_pack.py [出力先]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from settings import *
+from assets import ASSET_PACK_PATH, write_asset_pack
+from stages import load_stages
+from caustics import save_caustics
+
+# ゲーム内で使う (ファイル名, サイズ, しきい値)
+PACK_SPRITES = [
+    ("jellyfish_normal.png", (60, 60), 230),
+    ("jellyfish_hit.png", (60, 60), 230),
+    ("seaweed.png", (30, 120), 230),
+    ("sunfish.png", (70, 70), 230),
+    ("turtle.png", (120, 100), 230),
+    ("plastic_waste.png", (60, 60), 230),
+    # タイトル
+    ("jellyfish_normal.png", (200, 200), 230),
+]
+# チュートリアル・死因別画像（Game が AssetStreamer に登録するのと同じもの）
+PACK_SPRITES += [(filename, TUTORIAL_IMAGE_SIZE, 230) for filename in TUTORIAL_IMAGES.values()]
+PACK_SPRITES += [(filename, DEATH_IMAGE_SIZE, 230) for filename in DEATH_IMAGES.values()]
+
+# ステージの背景（stages.json）とゲームオーバー画面の背景
+PACK_BACKGROUNDS = [(filename, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                    for filename in dict.fromkeys([stage.background for stage in load_stages()] + [GAMEOVER_BACKGROUND])]
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else ASSET_PACK_PATH
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    start = time.perf_counter()
+    count = write_asset_pack(path, PACK_SPRITES, PACK_BACKGROUNDS)
+    elapsed = time.perf_counter() - start
+    print(f"{count} entries, {os.path.getsize(path) / 1024 / 1024:.1f} MiB -> {path} ({elapsed:.2f}s)")
+    if CAUSTICS_QUALITY in CAUSTICS_QUALITIES:
+        start = time.perf_counter()
+        caustics_path = save_caustics(CAUSTICS_QUALITY)
+        elapsed = time.perf_counter() - start
+        print(f"caustics {CAUSTICS_QUALITY}, {os.path.getsize(caustics_path) / 1024 / 1024:.1f} MiB -> {caustics_path} ({elapsed:.2f}s)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import math
+import numpy
+import pygame
+from settings import *
+
+# 水中の光の揺らぎ（集光模様）と深さのもや
+#
+# 模様は最初に1回だけ NumPy でまとめて計算し（AssetLoader のスレッドか
+# build_asset_pack.py で前もって）、8ビットのパレット付きSurfaceの列として持つ。
+# 描くときはステージの背景に加算で重ねた1枚を作り、アニメーションのコマが
+# 変わったときだけ作り直す（それ以外のフレームは同じ背景のまま差分描画できる）。
+
+CAUSTICS_CACHE = os.path.join(os.path.dirname(__file__), "caustics_{}.npy")
+TAU = 2 * math.pi
+
+def caustics_frames(size, count, iterations=5, zoom=1.2):
+    """ループする集光模様を count コマ、0〜255 の uint8 配列 (コマ, 幅, 高さ) で作る
+
+    波の位相をずらしながら座標を何度もゆがめ、明るい筋ができるところを求める。
+    位相は1周（count コマ）でちょうど 2π 進むので、最後のコマの次が最初のコマにつながる。
+    """
+    width, height = size
+    # 縦横の比を保つため、どちらも高さを1とした座標にする
+    x = (numpy.arange(width, dtype=numpy.float32) / height * TAU * zoom - 250)[:, None]
+    y = (numpy.arange(height, dtype=numpy.float32) / height * TAU * zoom - 250)[None, :]
+    px, py = numpy.broadcast_arrays(x, y)
+    intensity = numpy.float32(0.005)
+    frames = numpy.empty((count, width, height), dtype=numpy.uint8)
+    for frame in range(count):
+        phase = TAU * frame / count
+        ix, iy = px, py
+        c = numpy.ones((width, height), dtype=numpy.float32)
+        for n in range(iterations):
+            # 段ごとに向きと位相をずらす（進む速さは整数倍にしてループさせる）
+            t = numpy.float32(phase * (1 if n % 2 == 0 else -1) + n * 1.7)
+            ix, iy = (px + numpy.cos(t - ix) + numpy.sin(t + iy),
+                      py + numpy.sin(t - iy) + numpy.cos(t + ix))
+            c += 1 / numpy.hypot(px * intensity / numpy.sin(ix + t), py * intensity / numpy.cos(iy + t))
+        c /= iterations
+        c = numpy.abs(1.17 - c ** 1.4) ** 8
+        frames[frame] = numpy.clip(c * 255, 0, 255).astype(numpy.uint8)
+    return frames
+
+def load_caustics(quality=CAUSTICS_QUALITY):
+    """品質 quality の模様を返す（build_asset_pack.py で作った保存分があればそれを使う）"""
+    size, count = CAUSTICS_QUALITIES[quality]
+    path = CAUSTICS_CACHE.format(quality)
+    if os.path.exists(path):
+        try:
+            frames = numpy.load(path)
+            if frames.shape == (count,) + tuple(size) and frames.dtype == numpy.uint8:
+                return frames
+        except (OSError, ValueError):
+            pass
+        print(f"Ignoring stale caustics cache: {os.path.basename(path)}")
+    return caustics_frames(size, count)
+
+def save_caustics(quality=CAUSTICS_QUALITY):
+    """模様を計算して保存する（build_asset_pack.py から呼ぶ）。保存先を返す"""
+    size, count = CAUSTICS_QUALITIES[quality]
+    path = CAUSTICS_CACHE.format(quality)
+    numpy.save(path, caustics_frames(size, count))
+    return path
+
+def apply_fog(background, fog, color=FOG_COLOR):
+    """背景に上から下へ濃くなるもやを重ねたコピーを返す（fog は (上のアルファ, 下のアルファ)）"""
+    top, bottom = fog
+    width, height = background.get_size()
+    ramp = pygame.Surface((1, height), pygame.SRCALPHA)
+    for y in range(height):
+        ramp.set_at((0, y), color + (top + (bottom - top) * y // max(height - 1, 1),))
+    fogged = background.copy()
+    fogged.blit(pygame.transform.scale(ramp, (width, height)), (0, 0))
+    return fogged
+
+
+class CausticsLayer:
+    """ステージの背景に集光模様を重ねて、ループするアニメーションにする
+
+    quality は CAUSTICS_QUALITIES のキー（解像度とコマ数。多いほどなめらかで
+    メモリを使う）か 'off'。loader を渡すと模様の計算を裏で行い、
+    できるまでは背景をそのまま返す。1ループは CAUSTICS_LOOP_MS ミリ秒。
+    画面を作ってから使うこと（コマを画面の形式に変換して重ねる）。
+    """
+    def __init__(self, loader=None, quality=CAUSTICS_QUALITY, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.quality = quality
+        self.size = size
+        self.pending = None
+        self.surfaces = None   # 8ビットのパレット付きSurfaceのコマ
+        self.strength = None   # 今のパレットの明るさ
+        self.buffers = None    # 背景+模様を交互に描く2枚（毎回別のSurfaceを返して背景の変化を知らせる）
+        self.flip = 0
+        self.key = None        # 最後に作ったコマ (背景, 明るさ, コマ番号)
+        self.current = None
+        self.composed = 0      # 作り直した回数
+        if quality not in CAUSTICS_QUALITIES:
+            return
+        if loader is not None:
+            self.pending = loader.submit(load_caustics, quality)
+        else:
+            self.set_frames(load_caustics(quality))
+
+    def ready(self):
+        if self.surfaces is None and self.pending is not None and self.pending.ready():
+            try:
+                self.set_frames(self.pending.get())
+            except Exception as e:
+                print(f"Failed to generate caustics: {e}")
+            self.pending = None
+        return self.surfaces is not None
+
+    def set_frames(self, frames):
+        self.surfaces = [pygame.surfarray.make_surface(frame) for frame in frames]
+        self.strength = None
+        self.scratch = pygame.Surface(self.size).convert()
+        self.buffers = [pygame.Surface(self.size).convert() for _ in range(2)]
+
+    def set_strength(self, strength):
+        """模様の明るさ（0〜1）に合わせてパレットを作り直す"""
+        palette = [tuple(int(channel * i * strength) // 255 for channel in CAUSTICS_COLOR) for i in range(256)]
+        for surface in self.surfaces:
+            surface.set_palette(palette)
+        self.strength = strength
+
+    def compose(self, background, strength, ticks):
+        """時刻 ticks（ミリ秒）のコマを background に加算で重ねたSurfaceを返す
+
+        同じコマの間は同じSurfaceを返す。strength が0か、模様がまだ無ければ background のまま。
+        """
+        if background is None or not strength or not self.ready():
+            return background
+        index = ticks * len(self.surfaces) // CAUSTICS_LOOP_MS % len(self.surfaces)
+        key = (background, strength, index)
+        if key == self.key:
+            return self.current
+        if strength != self.strength:
+            self.set_strength(strength)
+
+        frame = self.surfaces[index]
+        if frame.get_size() == self.size:
+            self.scratch.blit(frame, (0, 0))
+        else:
+            # 低い解像度のコマはなめらかに拡大する（smoothscale は 8ビット不可なので先に変換）
+            pygame.transform.smoothscale(frame.convert(), self.size, self.scratch)
+        target = self.buffers[self.flip]
+        self.flip ^= 1
+        target.blit(background, (0, 0))
+        target.blit(self.scratch, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        self.key = key
+        self.current = target
+        self.composed += 1
+        return target
+
+    def memory_bytes(self):
+        """コマの画素データの合計（バイト）"""
+        if self.surfaces is None:
+            return 0
+        return sum(surface.get_pitch() * surface.get_height() for surface in self.surfaces)
+
+    def stats(self):
+        return {
+            'quality': self.quality,
+            'frames': len(self.surfaces) if self.surfaces is not None else 0,
+            'memory_bytes': self.memory_bytes(),
+            'composed': self.composed,
+        }
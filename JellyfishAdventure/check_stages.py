@@ -0,0 +1,60 @@
+"""ステージ定義（stages.json）を検査するツール
+
+誤り（知らない障害物、空の出現表、最小>最大の範囲、無い背景画像など）を全部表示する。
+正しければステージごとの背景・出現間隔・上限・出現表の割合を表示する。
+stages.json を書き換えたらゲームを起動する前にかけること（誤りがあると起動時に StageError になる）。
+
+使い方: python check_stages.py [stages.json]
+"""
+import argparse
+import json
+import sys
+
+from settings import *
+from stages import STAGES_PATH, validate_stages, compile_stages
+
+def describe(table):
+    """出現表を "seaweed 25% / sunfish 25% ..." にする"""
+    shares = {}
+    previous = 0
+    for kind, total in zip(table.types, table.cumulative):
+        shares[kind] = shares.get(kind, 0) + total - previous
+        previous = total
+    return " / ".join(f"{kind} {weight * 100 // table.total}%" for kind, weight in shares.items())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=STAGES_PATH, help="ステージ定義ファイル")
+    args = parser.parse_args()
+
+    try:
+        with open(args.path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"{args.path}: {e}")
+        sys.exit(1)
+
+    errors = validate_stages(data)
+    if errors:
+        print(f"{args.path}: {len(errors)} errors")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+
+    stages = compile_stages(data)
+    print(f"{args.path}: {len(stages)} stages ok")
+    for stage in stages:
+        cap = stage.max_obstacles if stage.max_obstacles is not None else "-"
+        if stage.initial_table is not None:
+            initial = f"{stage.initial_count} from table"
+        else:
+            initial = f"{len(stage.placed)} placed"
+        effects = f"  caustics {stage.caustics}" if stage.caustics else ""
+        if stage.fog:
+            effects += f"  fog {stage.fog[0]}-{stage.fog[1]}"
+        print(f"  stage {stage.number}: {stage.background}  initial {initial}  max {cap}{effects}")
+        for interval, table in stage.timeline(0).spawners:
+            print(f"    every {interval:g} ms: {describe(table)}")
+
+if __name__ == "__main__":
+    main()
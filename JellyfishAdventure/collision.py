@@ -0,0 +1,106 @@
+import pygame
+from settings import *
+
+class SpatialGroup(pygame.sprite.Group):
+    """一様グリッド（空間ハッシュ）付きのスプライトグループ
+
+    スプライトの rect が重なるセルに登録しておき、当たり判定では
+    近くのセルにいるスプライトだけを rect → マスクの順に調べる。
+    add / kill 時は自動で登録・削除される。移動後は refresh() を呼ぶと、
+    セルが変わったスプライトだけを登録し直す。
+    """
+    def __init__(self, *sprites, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}         # (cx, cy) -> set(sprite)
+        self.sprite_cells = {}  # sprite -> (cx0, cy0, cx1, cy1)
+        self.order = {}         # sprite -> 追加順（結果の順番をグループの順にそろえる）
+        self.next_order = 0
+        # 直近の collide() の統計
+        self.candidates = 0
+        self.rect_tests = 0
+        self.mask_tests = 0
+        super().__init__(*sprites)
+
+    def cell_range(self, rect):
+        cs = self.cell_size
+        return (rect.left // cs, rect.top // cs, (rect.right - 1) // cs, (rect.bottom - 1) // cs)
+
+    def insert(self, sprite, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(sprite)
+        self.sprite_cells[sprite] = cell_range
+
+    def discard(self, sprite):
+        cell_range = self.sprite_cells.pop(sprite, None)
+        if cell_range is None:
+            return
+        self.remove_cells(sprite, cell_range)
+
+    def remove_cells(self, sprite, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(sprite)
+                    if not cell:
+                        del self.cells[(cx, cy)]
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+        self.insert(sprite, self.cell_range(sprite.rect))
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.order.pop(sprite, None)
+        self.discard(sprite)
+
+    def refresh(self):
+        """移動したスプライトのうち、セルが変わったものだけ登録し直す"""
+        # キーは増減しない（値を入れ替えるだけ）ので、コピーせずにそのまま回す
+        for sprite, old_range in self.sprite_cells.items():
+            new_range = self.cell_range(sprite.rect)
+            if new_range != old_range:
+                self.remove_cells(sprite, old_range)
+                self.insert(sprite, new_range)
+
+    def nearby(self, rect):
+        """rect と同じセルにいるスプライト（候補）"""
+        cx0, cy0, cx1, cy1 = self.cell_range(rect)
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found |= cell
+        return found
+
+    def collide(self, sprite, collided=pygame.sprite.collide_mask):
+        """spritecollide(sprite, self, False, collided) と同じ結果を返す"""
+        candidates = self.nearby(sprite.rect)
+        self.candidates = len(candidates)
+        self.rect_tests = 0
+        self.mask_tests = 0
+        hits = []
+        for other in candidates:
+            self.rect_tests += 1
+            if not sprite.rect.colliderect(other.rect):
+                continue
+            self.mask_tests += 1
+            if collided(sprite, other):
+                hits.append(other)
+        hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def stats(self):
+        return {
+            'sprites': len(self.sprite_cells),
+            'cells': len(self.cells),
+            'candidates': self.candidates,
+            'rect_tests': self.rect_tests,
+            'mask_tests': self.mask_tests,
+        }
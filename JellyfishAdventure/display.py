@@ -0,0 +1,135 @@
+import math
+import weakref
+import pygame
+from settings import *
+from atlas import set_alpha
+
+class Display:
+    """ゲームを描く画面と、それをウィンドウに出す方法
+
+    ゲーム内の座標はいつも論理解像度 SCREEN_WIDTH x SCREEN_HEIGHT で、描く surface は
+    内部解像度 size（RENDER_SIZE）の大きさ。塗りや blit の量は size で決まり、
+    ウィンドウの大きさによらない。size が論理解像度より小さいときは、
+    to_render() / to_render_pos() で座標を、scale_image() で画像を内部解像度に合わせる
+    （画像は一度だけ縮めて覚えておく）。blit() / draw_rect() はそれをまとめたもの。
+      native   : 論理解像度のウィンドウに出す（size が違えば transform.scale で拡大）
+      scaled   : pygame.SCALED。SDLのレンダラーが size の画面をウィンドウの大きさに拡大して出す
+                 （デスクトップに収まる整数倍の大きさで開き、ウィンドウは変えられる）
+      software : オフスクリーンの surface に描き、出すときに transform.scale で
+                 window_size のウィンドウに拡大する（SDLのレンダラーが使えないとき用）
+    flip() / update(rects) は pygame.display の同名の関数の代わりに使う。
+    """
+    def __init__(self, mode=DISPLAY_MODE, window_size=WINDOW_SIZE, size=RENDER_SIZE,
+                 logical_size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.size = tuple(size)
+        self.logical_size = tuple(logical_size)
+        self.scale = (self.size[0] / self.logical_size[0], self.size[1] / self.logical_size[1])
+        self.scaled = self.size != self.logical_size
+        self.images = weakref.WeakKeyDictionary()  # 元の画像 -> 内部解像度に縮めたもの
+        self.mode = mode
+        if mode == 'scaled':
+            try:
+                self.surface = pygame.display.set_mode(self.size, pygame.SCALED | pygame.RESIZABLE)
+            except pygame.error:
+                print("SCALED display not available, falling back to software scaling")
+                self.mode = mode = 'software'
+        if mode == 'software':
+            pygame.display.set_mode(window_size, pygame.RESIZABLE)
+            self.surface = pygame.Surface(self.size).convert()
+        elif mode != 'scaled':
+            self.mode = 'native'
+            if self.scaled:
+                pygame.display.set_mode(self.logical_size)
+                self.surface = pygame.Surface(self.size).convert()
+            else:
+                self.surface = pygame.display.set_mode(self.size)
+        # ウィンドウとは別の surface に描いていて、出すときに拡大するか
+        self.offscreen = self.surface is not pygame.display.get_surface()
+
+    def window_size(self):
+        return pygame.display.get_window_size()
+
+    def to_logical(self, pos):
+        """ウィンドウ上のマウス座標を論理解像度の座標にする
+
+        native はそのまま、scaled はSDLが内部解像度の座標にしてくれるので拡大率で割り、
+        software はウィンドウの大きさとの比で割る。
+        """
+        if self.mode == 'software':
+            window_width, window_height = self.window_size()
+            return (pos[0] * self.logical_size[0] // max(window_width, 1),
+                    pos[1] * self.logical_size[1] // max(window_height, 1))
+        if self.mode == 'scaled' and self.scaled:
+            return (int(pos[0] / self.scale[0]), int(pos[1] / self.scale[1]))
+        return pos
+
+    def to_render_pos(self, pos):
+        """論理座標の点を内部解像度の座標にする"""
+        if not self.scaled:
+            return pos
+        return (round(pos[0] * self.scale[0]), round(pos[1] * self.scale[1]))
+
+    def to_render(self, rect):
+        """論理座標の Rect を内部解像度の Rect にする（はみ出さないよう外側に丸める）"""
+        rect = pygame.Rect(rect)
+        if not self.scaled:
+            return rect
+        scale_x, scale_y = self.scale
+        left, top = math.floor(rect.left * scale_x), math.floor(rect.top * scale_y)
+        right, bottom = math.ceil(rect.right * scale_x), math.ceil(rect.bottom * scale_y)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def scale_image(self, image):
+        """image を内部解像度に合わせて縮めたものを返す（画像ごとに一度だけ縮める）
+
+        カラーキーの画像は境目がにじまないよう transform.scale、それ以外は smoothscale。
+        元の画像の set_alpha() は縮めたものにも移す（点滅など）。
+        """
+        if not self.scaled:
+            return image
+        scaled = self.images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale[0])), max(1, round(height * self.scale[1])))
+            if image.get_colorkey() is not None or image.get_bitsize() < 24:
+                scaled = pygame.transform.scale(image, size)
+            else:
+                scaled = pygame.transform.smoothscale(image, size)
+            self.images[image] = scaled
+        alpha = image.get_alpha()
+        if scaled.get_alpha() != alpha:
+            if alpha is None:
+                scaled.set_alpha(None)
+            else:
+                set_alpha(scaled, alpha)
+        return scaled
+
+    def scale_layer(self, layer):
+        """論理解像度で合成した画面全体の Surface を内部解像度にする（場面の静的な部分用）"""
+        if not self.scaled:
+            return layer
+        return pygame.transform.smoothscale(layer, self.size)
+
+    def blit(self, image, pos):
+        """論理座標 pos に image を描き、描いた Rect（内部解像度）を返す"""
+        return self.surface.blit(self.scale_image(image), self.to_render_pos(pos))
+
+    def draw_rect(self, color, rect, width=0, **kwargs):
+        """論理座標の rect に pygame.draw.rect で描き、描いた Rect（内部解像度）を返す"""
+        return pygame.draw.rect(self.surface, color, self.to_render(rect), width, **kwargs)
+
+    def flip(self):
+        if self.offscreen:
+            window = pygame.display.get_surface()
+            if window.get_size() == self.size:
+                window.blit(self.surface, (0, 0))
+            else:
+                pygame.transform.scale(self.surface, window.get_size(), window)
+        pygame.display.flip()
+
+    def update(self, rects):
+        """変わった部分だけ出す（拡大して出すときは全体を出す）"""
+        if self.offscreen:
+            self.flip()
+        else:
+            pygame.display.update(rects)
@@ -1,58 +1,121 @@
 import pygame
 from settings import *
 import os
+import random
+import time
 
 
-from sprites import Jellyfish, Obstacle, Seaweed, Sunfish, Turtle, PlasticWaste, make_transparent, Bubble
-import random
+from sprites import Jellyfish, Seaweed, Sunfish, Turtle, PlasticWaste
+from particles import ParticleSystem
+from collision import SpatialGroup
+from pools import PoolSet
+from assets import sprite_cache, open_asset_pack, load_background, load_image, AssetLoader
+from streaming import AssetStreamer
+from profiler import FrameProfiler
+from audio import SoundManager
+from render import DirtyRenderer, draw_interpolated
+from display import Display
+from text import text_cache, TextLabel
+import sim
+from recording import InputRecorder, RecordingInput, RECORD_PATH, START, GAME_CLEAR
+from stages import load_stages
+from lifecycle import EntityLifecycle
+from caustics import CausticsLayer, apply_fog
+from scenes import TitleScene, TutorialScene, PlayScene, StageClearScene, GameOverScene, GameClearScene
+
+# stages.json の障害物の種類
+OBSTACLE_CLASSES = {
+    'seaweed': Seaweed,
+    'sunfish': Sunfish,
+    'turtle': Turtle,
+    'waste': PlasticWaste,
+}
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None, controls=None, render=True, show=False, record=RECORD_INPUT):
+        """headless=True: SDLのダミードライバで動かし、時計を SimClock にする。
+        seed を渡すと乱数ストリームを固定し、controls（ScriptedInput など）を
+        渡すとキーボード・マウスの代わりにそれを使う。同じシードと入力なら同じ結果になる。
+        render=False なら描画を省く（ヘッドレス時の高速化用）。
+        show=True ならヘッドレスでも本物のウィンドウに描く（リプレイの観戦用）。
+        record=True（既定は RECORD_INPUT）なら、普通に遊んだ入力を RECORD_DIR に記録する（recording.py）。
+        """
+        self.headless = headless
+        self.render = render
+        if headless and not show:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 内部解像度（RENDER_SIZE）の画面に描き、DISPLAY_MODE に従ってウィンドウに拡大して出す
+        self.display = Display('native' if headless and not show else DISPLAY_MODE)
+        self.screen = self.display.surface
         pygame.display.set_caption(TITLE)
-        self.clock = pygame.time.Clock()
+        self.clock = sim.SimClock() if headless else sim.RealClock()
+        # ゲーム内の時刻は物理ステップごとに進む（ヘッドレスでは描画1回=1ステップなので同じ時計）
+        self.step_clock = self.clock if headless else sim.SimClock(PHYSICS_HZ)
+        self.recorder = None
+        if record and not headless and controls is None:
+            # リプレイできるように、シードを決めてから入力を記録する
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            self.recorder = self.open_recording(seed)
+        sim.configure(self.step_clock, seed)
+        self.step_ms = 1000 / PHYSICS_HZ
+        self.accumulator = 0.0      # まだ進めていない実時間（ミリ秒）
+        self.previous_positions = {}  # 最後のステップの前の各スプライトの位置（補間用）
+        self.spawn_rng = sim.rng('spawn')
+        self.effect_rng = sim.rng('effects')
+        self.controls = controls if controls is not None else sim.LiveInput(self.display)
+        if self.recorder is not None:
+            self.controls = RecordingInput(self.controls, self.recorder)
+        self.frame = 0
+        self.result = None  # ヘッドレス実行の結果 ('game_over' / 'clear')
+        # フレーム内の処理時間の計測（無効時はほぼコストなし）
+        self.profiler = FrameProfiler(enabled=PROFILER_ENABLED, csv_path=PROFILER_CSV)
         self.running = True
-        self.state = "title" # title, playing, game_over
-        self.max_stage = 5  # ステージ数
+        self.scene = None  # 今の場面（scenes.py）。state はその名前
+        # ステージの定義（stages.json）。ステージ数はその数
+        self.stages = load_stages()
+        self.max_stage = len(self.stages)
 
         self.all_sprites = pygame.sprite.Group()
-        self.obstacles = pygame.sprite.Group()
-        self.bubbles = pygame.sprite.Group() # 泡グループ追加
+        self.obstacles = SpatialGroup() # 近くの障害物だけ当たり判定する
+        # 障害物は種類ごとのプールから取り出して使い回す
+        self.pools = PoolSet([Seaweed, Sunfish, Turtle, PlasticWaste], enabled=USE_SPRITE_POOLS)
+        # 障害物の寿命と種類ごとの数の記録（F4でグラフ表示）
+        self.lifecycle = EntityLifecycle(OBSTACLE_CLASSES)
+        self.particles = ParticleSystem(seed=sim.numpy_seed('particles')) # 泡はパーティクルとしてまとめて管理
+        # プレイ中は変わった部分だけ描き直す（多く変わったフレームは全体を描く）
+        self.renderer = DirtyRenderer(self.screen, enabled=USE_DIRTY_RECTS, display=self.display)
         self.stage = 1
         
         # アセットの読み込み
         assets_dir = os.path.join(os.path.dirname(__file__), "assets")
+        # 前処理済みのパックがあれば使う（無い・古い場合は個別ファイルを読む）
+        self.asset_pack = open_asset_pack() if USE_ASSET_PACK else None
+        sprite_cache.pack = self.asset_pack
         
         # タイトル画像（クラゲ）
-        self.title_image = pygame.image.load(os.path.join(assets_dir, "jellyfish_normal.png")).convert_alpha()
-        self.title_image = pygame.transform.scale(self.title_image, (200, 200))
-        # 白背景を透過
-        self.title_image = make_transparent(self.title_image)
-        
-        # 背景画像
-        self.bg_images = {}
-        self.bg_images[1] = pygame.image.load(os.path.join(assets_dir, "bg_natural_ocean.jpg")).convert()
-        self.bg_images[1] = pygame.transform.scale(self.bg_images[1], (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        self.bg_images[2] = pygame.image.load(os.path.join(assets_dir, "sea3.jpg")).convert()
-        self.bg_images[2] = pygame.transform.scale(self.bg_images[2], (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        self.bg_images[3] = pygame.image.load(os.path.join(assets_dir, "sea1.jpg")).convert()
-        self.bg_images[3] = pygame.transform.scale(self.bg_images[3], (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        self.bg_images[4] = pygame.image.load(os.path.join(assets_dir, "sea2.jpg")).convert()
-        self.bg_images[4] = pygame.transform.scale(self.bg_images[4], (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        self.bg_images[5] = pygame.image.load(os.path.join(assets_dir, "sea4.jpg")).convert()
-        self.bg_images[5] = pygame.transform.scale(self.bg_images[5], (SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        # ゲームオーバー画面用（sea5.jpg）
-        self.bg_images['gameover'] = pygame.image.load(os.path.join(assets_dir, "sea5.jpg")).convert()
-        self.bg_images['gameover'] = pygame.transform.scale(self.bg_images['gameover'], (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 白背景を透過したものを共有キャッシュから取得
+        self.title_image, _ = sprite_cache.get("jellyfish_normal.png", (200, 200))
+        
+        # 背景画像（ゲームオーバー画面用は sea5.jpg）
+        # ステージの画像は AssetStreamer で今と次のステージの分だけ裏で読み込み、
+        # 使わなくなったものは ASSET_MEMORY_BUDGET を超えた分から手放す
+        self.loader = AssetLoader()
+        self.assets = AssetStreamer(self.loader)
+        for stage in self.stages:
+            self.assets.register(('bg', stage.number), load_background, stage.background, pack=self.asset_pack)
+        self.assets.register(('bg', 'gameover'), load_background, GAMEOVER_BACKGROUND, pack=self.asset_pack)
+        self.bg_images = self.assets.view('bg')
+        # プレイ中の背景に重ねる光の揺らぎ（模様は裏で1回だけ計算する）ともや
+        self.caustics = CausticsLayer(self.loader if render else None, quality=CAUSTICS_QUALITY if render else 'off',
+                                      size=self.display.size)
+        self.fogged_bg = (None, None)  # (元の背景, もやを重ねたもの)
         
-        # タイトル用は1と同じ
-        self.bg_image = self.bg_images[1]
+        self.start_button_rect = pygame.Rect(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 150, 200, 50)
+        # 場面ごとに合成済みの静的レイヤー {場面名: (キー, Surface)}
+        self.scene_layers = {}
         
         # 日本語フォント（システムフォントを使用）
         try:
@@ -63,20 +126,13 @@ class Game:
             self.jp_font_large = pygame.font.SysFont(None, 48)
             self.jp_font_medium = pygame.font.SysFont(None, 32)
             self.jp_font_small = pygame.font.SysFont(None, 24)
+        # HUDのステージ表示（ステージが変わったときだけ描き直す）
+        self.stage_label = TextLabel(self.jp_font_small, "ステージ {}", WHITE)
         
         # 障害物画像の読み込み（チュートリアル用）
-        self.tutorial_images = {}
-        obstacle_files = {
-            'seaweed': 'seaweed.png',
-            'sunfish': 'sunfish.png',
-            'turtle': 'turtle.png',
-            'waste': 'plastic_waste.png'
-        }
-        for name, filename in obstacle_files.items():
-            img = pygame.image.load(os.path.join(assets_dir, filename)).convert_alpha()
-            img = pygame.transform.scale(img, (150, 150))  # サイズを大きく変更
-            img = make_transparent(img)
-            self.tutorial_images[name] = img
+        self.tutorial_images = self.assets.view('tutorial')
+        for name, filename in TUTORIAL_IMAGES.items():
+            self.assets.register(('tutorial', name), load_image, filename, TUTORIAL_IMAGE_SIZE, pack=self.asset_pack)
         
         # チュートリアル会話データ
         self.tutorial_dialogues = [
@@ -90,26 +146,13 @@ class Game:
         self.tutorial_index = 0
         self.tutorial_active = False
         self.death_cause = None  # ゲームオーバー時の原因
+        self.stage_start_step = None  # 今のステージを始めた物理ステップ（リプレイ用）
         
         # 死因別画像の読み込み
-        self.death_images = {}
-        death_img_files = {
-            'seaweed': 'jellyfish_seaweed.jpg',
-            'waste': 'jellyfish_plastic_waste.jpg',
-            'turtle': 'jellyfish_turtle.jpg',
-            'sunfish': 'jellyfish_sunfish.jpg'
-        }
-        for cause, filename in death_img_files.items():
-            path = os.path.join(assets_dir, filename)
-            if os.path.exists(path):
-                img = pygame.image.load(path).convert_alpha()
-                img = pygame.transform.scale(img, (500, 400)) # 画像サイズをさらに大きく
-                self.death_images[cause] = make_transparent(img)
-            else:
-                self.death_images[cause] = None
-
-
-
+        self.death_images = self.assets.view('death')
+        for cause, filename in DEATH_IMAGES.items():
+            if os.path.exists(os.path.join(assets_dir, filename)):
+                self.assets.register(('death', cause), load_image, filename, DEATH_IMAGE_SIZE, pack=self.asset_pack)
 
         try:
             pygame.mixer.init()
@@ -118,46 +161,68 @@ class Game:
             print("Sound init failed")
             self.sound_enabled = False
             
-        # 効果音読み込み
-        self.sounds = {}
-        if self.sound_enabled:
-            sound_files = {
-                'dash': 'dash.wav',
-                'hit': 'hit.wav',
-                'clear': 'clear.wav',
-                'gameover': 'gameover.wav'
-            }
-            sound_dir = os.path.join(assets_dir, "sounds")
-            for name, filename in sound_files.items():
-                path = os.path.join(sound_dir, filename)
-                if os.path.exists(path):
-                    try:
-                        self.sounds[name] = pygame.mixer.Sound(path)
-                        self.sounds[name].set_volume(0.5)
-                    except:
-                        print(f"Failed to load sound: {filename}")
-        
+        # 効果音は裏で読み込み、種類ごとのチャンネル・同時数・間隔を守って鳴らす
+        self.audio = SoundManager(self.loader, enabled=self.sound_enabled)
+        self.sounds = self.audio.sounds
+
+        self.change_scene(TitleScene(self))
+
+    @property
+    def state(self):
+        """今の場面の名前（title, playing, stage_clear, game_over, game_clear）"""
+        return self.scene.name
+
+    def change_scene(self, scene):
+        self.scene = scene
+        scene.enter()
+        self.stream_assets()
+
+    def stream_assets(self):
+        """今と次に要る画像を AssetStreamer に知らせる（場面やステージ、HPが変わったとき）
+
+        背景は今と次のステージ、チュートリアルの絵はタイトルとチュートリアルの間、
+        死因別の絵とゲームオーバーの背景は残りHPが1以下になってから。
+        """
+        keys = [('bg', self.stage), ('bg', min(self.stage + 1, self.max_stage))]
+        if self.scene is not None and self.scene.name == 'title' or self.tutorial_active:
+            keys += [('tutorial', name) for name in ('seaweed', 'sunfish', 'turtle', 'waste')]
+        player = getattr(self, 'player', None)
+        if self.scene is not None and self.scene.name == 'game_over' or player is not None and player.hp <= 1:
+            keys += [('death', cause) for cause in ('seaweed', 'sunfish', 'turtle', 'waste')]
+            keys.append(('bg', 'gameover'))
+        self.assets.keep(key for key in keys if key in self.assets)
+
+    def start_game(self):
+        """今のステージを始める（ステージ1はチュートリアルから）"""
+        self.new_game()
+        self.change_scene(TutorialScene(self) if self.tutorial_active else PlayScene(self))
+
     def play_sound(self, name):
-        if self.sound_enabled and name in self.sounds:
-            self.sounds[name].play()
+        self.audio.play(name)
 
     def play_bgm(self, filename):
-        if self.sound_enabled:
-            path = os.path.join(os.path.dirname(__file__), "assets", "sounds", filename)
-            if os.path.exists(path):
-                try:
-                    pygame.mixer.music.load(path)
-                    pygame.mixer.music.set_volume(0.4)
-                    pygame.mixer.music.play(-1) # ループ再生
-                except:
-                    print(f"Failed to load BGM: {filename}")
+        self.audio.play_music(filename)
 
     def new_game(self):
+        for _ in self.setup_stage():
+            pass
+
+    def setup_stage(self):
+        """new_game() の中身。yield のところで区切って数フレームに分けられる"""
         # プレイヤー配置（画面下部中央からスタート）
-        self.player = Jellyfish((SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100))
+        self.player = Jellyfish((SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100), self.controls)
         self.all_sprites.add(self.player)
-        
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.particles.clear()
+        self.renderer.invalidate()
+        self.scene_layers.pop('tutorial', None)
+        self.previous_positions = {}
+        self.stage_start_step = self.step_clock.frame
+        self.record(START, self.stage)
+        self.stream_assets()
+        
+        # このステージの出現予定（stages.json の spawners）
+        self.timeline = self.stages[self.stage - 1].timeline(sim.get_ticks())
+        yield
         
         # ステージ1はチュートリアル
         if self.stage == 1:
@@ -168,173 +233,194 @@ class Game:
             # 初期障害物を配置
             self.spawn_initial_obstacles()
 
-    def spawn_initial_obstacles(self):
-        """ステージ開始時に障害物を配置"""
-        if self.stage == 1:
-            # チュートリアル終了後、全種類1体ずつ配置
-            obstacles_to_spawn = ['seaweed', 'sunfish', 'turtle', 'waste']
-            y_positions = [200, 300, 400, 350]
-            x_positions = [150, 500, 300, 650]
-            
-            for i, obs_type in enumerate(obstacles_to_spawn):
-                pos = (x_positions[i], y_positions[i])
-                if obs_type == 'seaweed':
-                    obs = Seaweed(pos)
-                elif obs_type == 'sunfish':
-                    obs = Sunfish(pos, self.player)
-                elif obs_type == 'turtle':
-                    obs = Turtle(pos)
-                elif obs_type == 'waste':
-                    obs = PlasticWaste(pos)
-                
-                self.all_sprites.add(obs)
-                self.obstacles.add(obs)
+    def prepare_stage(self, stage):
+        """ステージ stage を始める準備を、場面の切り替え中に1フレーム1段ずつ進める
+
+        前のステージのスプライトを片付け、背景を裏で読み終わるのを待ってから
+        new_game() と同じ順にプレイヤーと障害物を置く（物理ステップは進まないので
+        一度に new_game() したのと同じ結果になる）。
+        """
+        self.clear_sprites()
+        yield
+        self.stage = stage
+        while not self.bg_images.ready(stage):
+            yield
+        yield from self.setup_stage()
+
+    def add_obstacle(self, obs):
+        self.all_sprites.add(obs)
+        self.obstacles.add(obs)
+
+    def clear_sprites(self):
+        self.all_sprites.empty()
+        self.obstacles.empty()
+        self.lifecycle.clear()
+
+    def update_sprites(self):
+        # 寿命の切れた障害物を消してから動かす（種類ごとの数もここで記録する）
+        now = sim.get_ticks()
+        self.lifecycle.expire(now)
+        self.lifecycle.sample(now, self.obstacles)
+        self.all_sprites.update()
+        self.obstacles.refresh()
+
+    def make_obstacle(self, kind, pos):
+        """種類の名前（stages.json の type）から障害物をプールで作る"""
+        obstacle_class = OBSTACLE_CLASSES[kind]
+        if obstacle_class is Sunfish:
+            obs = self.pools.acquire(Sunfish, pos, self.player)  # プレイヤーを渡す
         else:
-            # 他のステージは5-6体をランダム配置
-            num_obstacles = random.randint(5, 6)
-            for _ in range(num_obstacles):
-                choice = random.choice(['seaweed', 'sunfish', 'turtle', 'waste'])
-                
-                if choice == 'seaweed':
-                    pos = (random.randint(0, SCREEN_WIDTH), random.randint(100, SCREEN_HEIGHT))
-                    obs = Seaweed(pos)
-                elif choice == 'sunfish':
-                    y = random.randint(50, SCREEN_HEIGHT - 50)
-                    if random.random() < 0.5:
-                        pos = (-50, y)
-                    else:
-                        pos = (SCREEN_WIDTH + 50, y)
-                    obs = Sunfish(pos, self.player)
-                elif choice == 'turtle':
-                    pos = (random.randint(100, SCREEN_WIDTH-100), random.randint(100, SCREEN_HEIGHT-100))
-                    obs = Turtle(pos)
-                elif choice == 'waste':
-                    pos = (random.randint(0, SCREEN_WIDTH), -30)
-                    obs = PlasticWaste(pos)
-                
-                self.all_sprites.add(obs)
-                self.obstacles.add(obs)
+            obs = self.pools.acquire(obstacle_class, pos)
+        self.lifecycle.track(obs, kind, sim.get_ticks())
+        return obs
+
+    def spawn_initial_obstacles(self):
+        """ステージ開始時に障害物を配置（stages.json の initial）"""
+        for kind, pos in self.stages[self.stage - 1].initial_obstacles(self.spawn_rng):
+            self.add_obstacle(self.make_obstacle(kind, pos))
 
     def spawn_obstacle(self):
         # チュートリアル中は障害物なし
         if self.tutorial_active:
             return
             
-        now = pygame.time.get_ticks()
-        
-        # ステージ1は障害物を1体ずつ（既にいたら出さない）
-        if self.stage == 1:
-            if len(self.obstacles) >= 1:
-                return
-            current_spawn_rate = 2000  # ゆっくり出す
-        else:
-            # ステージが進むほどスポーン間隔を短くする（難易度アップ）
-            current_spawn_rate = max(500, OBSTACLE_SPAWN_RATE - (self.stage - 1) * 200)
-        
-        if now - self.last_spawn_time > current_spawn_rate:
-            self.last_spawn_time = now
-            choice = random.choice(['seaweed', 'sunfish', 'turtle', 'waste'])
-            
-            if choice == 'seaweed':
-                # 画面下半分から出現
-                pos = (random.randint(0, SCREEN_WIDTH), random.randint(SCREEN_HEIGHT // 2, SCREEN_HEIGHT))
-                obs = Seaweed(pos)
-            elif choice == 'sunfish':
-                y = random.randint(50, SCREEN_HEIGHT - 50)
-                # 左右どちらかから出現
-                if random.random() < 0.5:
-                    pos = (-50, y)
-                else:
-                    pos = (SCREEN_WIDTH + 50, y)
-                obs = Sunfish(pos, self.player)  # プレイヤーを渡す
-            elif choice == 'turtle':
-                pos = (random.randint(100, SCREEN_WIDTH-100), random.randint(100, SCREEN_HEIGHT-100))
-                obs = Turtle(pos)
-            elif choice == 'waste':
-                # 画面上部6割から出現
-                pos = (random.randint(0, SCREEN_WIDTH), random.randint(-50, int(SCREEN_HEIGHT * 0.6)))
-                obs = PlasticWaste(pos)
-            
-            self.all_sprites.add(obs)
-            self.obstacles.add(obs)
+        # 予定の時刻が来た出現表から1体ずつ出す（来ていなければヒープの先頭を見るだけ）
+        now = sim.get_ticks()
+        table = self.timeline.due(now, len(self.obstacles))
+        while table is not None:
+            self.add_obstacle(self.make_obstacle(*table.roll(self.spawn_rng)))
+            table = self.timeline.due(now, len(self.obstacles))
+
+    def run(self, frames=None):
+        """メインループ。frames を指定するとそのフレーム数だけ進めて戻る
 
-    def run(self):
+        各フレームで今の場面（scenes.py）の update() と draw() を呼ぶ。
+        プレイ中は物理を固定ステップで進め（描画が遅れたら最大 MAX_SUBSTEPS まで
+        追いつく）、描画はディスプレイの速さで行ってステップ間の位置を補間する。
+        ヘッドレス実行では1フレームにちょうど1ステップ進める。
+        """
         while self.running:
-            self.clock.tick(FPS)
-            
-            if self.state == "title":
-                self.title_scene()
-            elif self.state == "playing":
-                if self.tutorial_active:
-                    self.tutorial_scene()
-                else:
-                    self.events()
-                    self.update()
-                    self.draw()
+            if frames is not None:
+                if frames <= 0:
+                    break
+                frames -= 1
+            scene = self.scene
+            elapsed = self.clock.tick(FPS if self.headless else scene.fps)
+            self.profiler.begin_frame()
+            # 裏で読み終わった画像を受け取る
+            self.assets.poll()
+            
+            # どの場面もこのループから1フレームずつ進める（場面が変わったフレームは描かない）
+            scene.update(elapsed)
+            if self.render and self.running and self.scene is scene:
+                scene.draw()
+        
+        # 終了したら裏の読み込みも止める（frames 指定で途中で戻るときはそのまま）
+        if not self.running:
+            self.loader.shutdown()
+            self.profiler.stop_csv()
+            if self.recorder is not None:
+                self.recorder.close()
 
-    def title_scene(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE or event.key == pygame.K_RETURN:
-                    self.state = "playing"
-                    self.new_game()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # ボタンのクリック判定
-                mouse_pos = pygame.mouse.get_pos()
-                if self.start_button_rect.collidepoint(mouse_pos):
-                    self.state = "playing"
-                    self.new_game()
-        
+    def open_recording(self, seed):
+        try:
+            os.makedirs(RECORD_PATH, exist_ok=True)
+            path = os.path.join(RECORD_PATH, time.strftime("%Y%m%d-%H%M%S") + ".jfrec")
+            return InputRecorder(path, seed, self.step_clock)
+        except OSError as e:
+            print(f"Failed to open input recording: {e}")
+            return None
+
+    def record(self, kind, *values):
+        if self.recorder is not None:
+            self.recorder.write(kind, *values)
+
+    def next_frame(self):
+        self.frame += 1
+        self.controls.update(self.frame)
+
+    def steps_due(self, elapsed):
+        """経過時間 elapsed (ms) の間に進めるべき物理ステップ数"""
+        if self.headless:
+            return 1
+        self.accumulator += elapsed
+        steps = min(int(self.accumulator // self.step_ms), MAX_SUBSTEPS)
+        self.accumulator -= steps * self.step_ms
+        if steps == MAX_SUBSTEPS:
+            # 追いつけないほど遅れたら、残りは捨てて（ゲームをゆっくりにして）続ける
+            self.accumulator = min(self.accumulator, self.step_ms)
+        return steps
+
+    def step(self):
+        """物理を1ステップ進める"""
+        if not self.headless:
+            self.step_clock.tick()
+        self.next_frame()
+        self.update()
+
+    def remember_positions(self):
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.all_sprites}
+
+    def interpolation(self):
+        """描画に使う補間の割合（補間しないときは None）"""
+        if self.headless or not INTERPOLATE:
+            return None
+        return self.accumulator / self.step_ms
+
+    def compose_layer(self, compose, *args):
+        """場面の静的な部分を、論理解像度で一度だけ合成して内部解像度の画面の大きさにする"""
+        if self.display.scaled:
+            layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        else:
+            layer = self.screen.copy()
+        compose(layer, *args)
+        return self.display.scale_layer(layer)
+
+    def cached_layer(self, name, key, compose, *args):
+        """compose_layer の結果を場面ごとに覚えておき、key が変わったときだけ作り直す"""
+        cached = self.scene_layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, self.compose_layer(compose, *args))
+            self.scene_layers[name] = cached
+        return cached[1]
+
+    def compose_title(self, surface):
+        """タイトル画面"""
         # 背景画像を描画
-        self.screen.blit(self.bg_image, (0, 0))
+        surface.blit(self.bg_images[1], (0, 0))
         
         # 半透明のオーバーレイ（タイトルを見やすく）
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 50, 100))
-        self.screen.blit(overlay, (0, 0))
+        surface.blit(overlay, (0, 0))
         
         # タイトル文字（日本語）
-        title_text = self.jp_font_large.render("海に負けるな！くらげちゃん", True, WHITE)
+        title_text = text_cache.render(self.jp_font_large, "海に負けるな！くらげちゃん", WHITE)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 80))
-        self.screen.blit(title_text, title_rect)
+        surface.blit(title_text, title_rect)
         
         # クラゲの画像（透過済み）
         image_rect = self.title_image.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 30))
-        self.screen.blit(self.title_image, image_rect)
+        surface.blit(self.title_image, image_rect)
         
         # スタートボタン
-        self.start_button_rect = pygame.Rect(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 150, 200, 50)
-        pygame.draw.rect(self.screen, CYAN, self.start_button_rect, border_radius=10)
-        pygame.draw.rect(self.screen, WHITE, self.start_button_rect, 3, border_radius=10)
+        pygame.draw.rect(surface, CYAN, self.start_button_rect, border_radius=10)
+        pygame.draw.rect(surface, WHITE, self.start_button_rect, 3, border_radius=10)
         
-        button_text = self.jp_font_medium.render("スタート", True, BLACK)
+        button_text = text_cache.render(self.jp_font_medium, "スタート", BLACK)
         button_text_rect = button_text.get_rect(center=self.start_button_rect.center)
-        self.screen.blit(button_text, button_text_rect)
+        surface.blit(button_text, button_text_rect)
         
         # 操作説明
-        help_text = self.jp_font_small.render("スペース長押し → マウス方向にダッシュ！", True, WHITE)
+        help_text = text_cache.render(self.jp_font_small, "スペース長押し → マウス方向にダッシュ！", WHITE)
         help_rect = help_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
-        self.screen.blit(help_text, help_rect)
-        
-        pygame.display.flip()
+        surface.blit(help_text, help_rect)
 
-    def tutorial_scene(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                    self.tutorial_index += 1
-                    if self.tutorial_index >= len(self.tutorial_dialogues):
-                        self.tutorial_active = False
-                        # チュートリアル終了後、障害物を配置
-                        self.spawn_initial_obstacles()
-        
+    def compose_tutorial(self, surface):
+        """チュートリアルの会話画面（会話ごと）"""
         # 背景描画
-        self.screen.blit(self.bg_images[self.stage], (0, 0))
-        self.all_sprites.draw(self.screen)
+        surface.blit(self.bg_images[self.stage], (0, 0))
+        self.all_sprites.draw(surface)
         
         if self.tutorial_index < len(self.tutorial_dialogues):
             dialogue = self.tutorial_dialogues[self.tutorial_index]
@@ -346,71 +432,72 @@ class Game:
             # 半透明の背景
             box_surface = pygame.Surface((box_rect.width, box_rect.height), pygame.SRCALPHA)
             box_surface.fill((0, 0, 50, 200))
-            self.screen.blit(box_surface, box_rect.topleft)
-            pygame.draw.rect(self.screen, WHITE, box_rect, 3, border_radius=10)
+            surface.blit(box_surface, box_rect.topleft)
+            pygame.draw.rect(surface, WHITE, box_rect, 3, border_radius=10)
             
             # テキスト表示
-            y_offset = box_rect.top + 20
-            for line in dialogue["text"]:
-                text_surface = self.jp_font_medium.render(line, True, WHITE)
-                self.screen.blit(text_surface, (box_rect.left + 20, y_offset))
-                y_offset += 35
+            text_block = text_cache.render_lines(self.jp_font_medium, dialogue["text"], WHITE, line_height=35)
+            surface.blit(text_block, (box_rect.left + 20, box_rect.top + 20))
             
             # 障害物画像表示（画面中央上部）
             if dialogue["image"]:
                 img = self.tutorial_images[dialogue["image"]]
                 img_rect = img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-                self.screen.blit(img, img_rect)
+                surface.blit(img, img_rect)
             else:
                 # クラゲ画像を表示
                 img_rect = self.title_image.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-                self.screen.blit(self.title_image, img_rect)
+                surface.blit(self.title_image, img_rect)
             
             # 進行案内
-            hint_text = self.jp_font_small.render("Enter または Space で次へ", True, YELLOW)
+            hint_text = text_cache.render(self.jp_font_small, "Enter または Space で次へ", YELLOW)
             hint_rect = hint_text.get_rect(bottomright=(box_rect.right - 10, box_rect.bottom - 10))
-            self.screen.blit(hint_text, hint_rect)
-        
-        pygame.display.flip()
+            surface.blit(hint_text, hint_rect)
 
     def events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                # 処理時間の計測とグラフ表示を切り替える
+                self.profiler.toggle()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                # 種類ごとの障害物の数のグラフを切り替える
+                self.lifecycle.toggle()
+        self.profiler.mark('events')
 
     def update(self):
-        self.all_sprites.update()
+        self.update_sprites()
+        self.profiler.mark('sprites')
         self.spawn_obstacle()
+        self.profiler.mark('spawn')
         
         # 泡の生成
         # 通常時：ランダムに少し出す
-        if random.random() < 0.1:
-            bubble = Bubble(self.player.rect.center, speed_y=random.uniform(1, 3))
-            self.all_sprites.add(bubble)
-            self.bubbles.add(bubble)
+        self.particles.update()
+        if self.effect_rng.random() < 0.1:
+            self.particles.emit(self.player.rect.center, speed=(1, 3), radius=(2, 6))
             
         # ダッシュ判定：playerの速度が大きいとき
         if self.player.vel.length() > 3:
-            # 音を鳴らす（連続再生防止のため確率で間引くか、タイマー管理がベストだが簡易的に）
-            if random.random() < 0.1: 
+            # 音を鳴らす（確率で間引き、重なりと間隔は SoundManager が抑える）
+            if self.effect_rng.random() < 0.1: 
                 self.play_sound('dash')
                 
             # たくさん出す
-            for _ in range(2):
-                offset = (random.randint(-10, 10), random.randint(-10, 10))
-                pos = (self.player.rect.centerx + offset[0], self.player.rect.centery + offset[1])
-                bubble = Bubble(pos, speed_y=random.uniform(2, 5), size=random.randint(3, 8))
-                self.all_sprites.add(bubble)
-                self.bubbles.add(bubble)
+            self.particles.emit(self.player.rect.center, count=2, speed=(2, 5), radius=(3, 8), spread=10)
+        self.profiler.mark('bubbles')
         
         # 衝突判定
         if not self.player.invincible:
-            hits = pygame.sprite.spritecollide(self.player, self.obstacles, False, pygame.sprite.collide_mask)
+            hits = self.obstacles.collide(self.player, pygame.sprite.collide_mask)
+            self.profiler.mark('collision')
             if hits:
                 self.player.hp -= 1
                 self.play_sound('hit')
+                self.stream_assets()
                 self.player.invincible = True
-                self.player.invincible_timer = pygame.time.get_ticks()
+                self.player.invincible_timer = sim.get_ticks()
                 
                 # どの障害物に当たったかを記録
                 hit_obstacle = hits[0]
@@ -426,302 +513,219 @@ class Game:
                     self.death_cause = None
                 
                 if self.player.hp <= 0:
-                    self.game_over_scene()
+                    if self.recorder is not None:
+                        self.recorder.game_over(self.stage, self.death_cause)
+                    self.change_scene(GameOverScene(self))
+                    return
 
         # クリア判定（上端到達）
         if self.player.rect.top <= 0:
             if self.stage >= self.max_stage:
                 # 全ステージクリア！
-                self.game_clear_scene()
+                self.record(GAME_CLEAR)
+                self.change_scene(GameClearScene(self))
             else:
                 # ステージクリア画面
-                self.stage_clear_scene()
+                self.change_scene(StageClearScene(self))
 
-    def draw(self):
-        # ステージに応じた背景を使用
-        if self.stage in self.bg_images:
-            self.screen.blit(self.bg_images[self.stage], (0, 0))
+    def stage_background(self):
+        """プレイ中の背景（もやを重ね、光の揺らぎのコマが変わったときだけ別のSurfaceになる）"""
+        background = self.bg_images.get(self.stage)
+        if background is None:
+            return None
+        stage = self.stages[self.stage - 1]
+        if stage.fog:
+            if self.fogged_bg[0] is not background:
+                self.fogged_bg = (background, apply_fog(background, stage.fog))
+            background = self.fogged_bg[1]
+        # 内部解像度に縮めるのは背景ごとに一度だけ（光の揺らぎは縮めた後に重ねる）
+        background = self.display.scale_image(background)
+        return self.caustics.compose(background, stage.caustics, sim.get_ticks())
+
+    def draw(self, alpha=None):
+        """alpha を渡すと、スプライトを前のステップからの補間位置に描く"""
+        # ステージに応じた背景を使用（範囲外の場合は深い青）
+        # 差分描画では前フレームで描いた場所だけ背景で塗り戻す
+        self.renderer.begin(self.stage_background())
+        self.profiler.mark('background')
+        
+        # 座標は論理解像度、描くのは内部解像度の画面（display が変換する）
+        display = self.display
+        if alpha is None and not display.scaled:
+            self.all_sprites.draw(self.screen)
         else:
-            # ステージが範囲外の場合は深い青
-            self.screen.fill((0, 0, 50))
-        
-        self.all_sprites.draw(self.screen)
+            draw_interpolated(self.all_sprites, self.screen, self.previous_positions if alpha is not None else {},
+                              alpha or 0, display)
+        self.renderer.add_group(self.all_sprites)
+        self.particles.draw(self.screen, display.scale)
+        bounds = self.particles.bounds()
+        self.renderer.add(display.to_render(bounds) if bounds is not None else None)
+        self.profiler.mark('draw')
         
         # HUD: HPとチャージ状況
         # HPバー（黒枠に赤の中身）
-        pygame.draw.rect(self.screen, BLACK, (10, 10, PLAYER_START_HP * 30, 20))
-        pygame.draw.rect(self.screen, RED, (10, 10, self.player.hp * 30, 20))
-        pygame.draw.rect(self.screen, WHITE, (10, 10, PLAYER_START_HP * 30, 20), 2)
+        display.draw_rect(BLACK, (10, 10, PLAYER_START_HP * 30, 20))
+        display.draw_rect(RED, (10, 10, self.player.hp * 30, 20))
+        self.renderer.add(display.draw_rect(WHITE, (10, 10, PLAYER_START_HP * 30, 20), 2))
         
         # チャージバー
         if self.player.is_charging:
-            charge_time = pygame.time.get_ticks() - self.player.charge_start_time
+            charge_time = sim.get_ticks() - self.player.charge_start_time
             bar_width = min(charge_time // 5, 200)
-            pygame.draw.rect(self.screen, YELLOW, (10, 40, bar_width, 10))
-            pygame.draw.rect(self.screen, WHITE, (10, 40, 200, 10), 1)
+            display.draw_rect(YELLOW, (10, 40, bar_width, 10))
+            self.renderer.add(display.draw_rect(WHITE, (10, 40, 200, 10), 1))
 
         # ステージ表示
-        stage_text = self.jp_font_small.render(f"ステージ {self.stage}", True, WHITE)
-        self.screen.blit(stage_text, (SCREEN_WIDTH - 120, 10))
+        stage_text = self.stage_label.render(self.stage)
+        self.renderer.add(display.blit(stage_text, (SCREEN_WIDTH - 120, 10)))
         
         # チュートリアル表示（ステージ1のみ）
         if self.stage == 1:
-            tutorial_text = self.jp_font_medium.render("スペースを長押ししてダッシュ！", True, WHITE)
+            tutorial_text = text_cache.render(self.jp_font_medium, "スペースを長押ししてダッシュ！", WHITE)
             tutorial_rect = tutorial_text.get_rect(center=(SCREEN_WIDTH//2, 50))
-            self.screen.blit(tutorial_text, tutorial_rect)
+            self.renderer.add(display.blit(tutorial_text, tutorial_rect.topleft))
             
-            goal_text = self.jp_font_small.render("↑ 上を目指せ！ ↑", True, YELLOW)
+            goal_text = text_cache.render(self.jp_font_small, "↑ 上を目指せ！ ↑", YELLOW)
             goal_rect = goal_text.get_rect(center=(SCREEN_WIDTH//2, 80))
-            self.screen.blit(goal_text, goal_rect)
-
-        pygame.display.flip()
-
-    def stage_clear_scene(self):
-        # クリア音再生
-        self.play_sound('clear')
-        
-        # ステージクリア画面
-        waiting = True
-        while waiting:
-            self.clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    waiting = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                        # 次のステージへ
-                        self.stage += 1
-                        self.all_sprites.empty()
-                        self.obstacles.empty()
-                        self.new_game()
-                        waiting = False
-            
-            # 現在のステージの背景を表示
-            if self.stage in self.bg_images:
-                self.screen.blit(self.bg_images[self.stage], (0, 0))
-            
-            # 半透明オーバーレイ
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((255, 255, 100, 150))
-            self.screen.blit(overlay, (0, 0))
-            
-            # クリアテキスト
-            clear_text = self.jp_font_large.render(f"Stage {self.stage} Clear!", True, YELLOW)
-            clear_rect = clear_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
-            self.screen.blit(clear_text, clear_rect)
-            
-            # 次へ案内
-            next_text = self.jp_font_medium.render("Enter または Space で次のステージへ", True, WHITE)
-            next_rect = next_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
-            self.screen.blit(next_text, next_rect)
-            
-            pygame.display.flip()
-
-    def game_over_scene(self):
-        # ゲームオーバー音再生
-        self.play_sound('gameover')
-        
-        # 障害物別のメッセージ
-        death_messages = {
-            'seaweed': ["うわ～～、絡まって動けないーー！", "海藻に絡まってしまった..."],
-            'waste': ["うわっ、なんだこれ！気持ち悪いよー！", "プラスチックごみに襲われてしまった..."],
-            'turtle': ["うわっ、やめろー！く、食べるなー、ぐわー！", "ウミガメに食べられてしまった..."],
-            'sunfish': ["や、やめろ、やめｒｒｒ、、、", "マンボウに食べられてしまった..."]
-        }
-        
-        # デフォルトメッセージ
-        if self.death_cause in death_messages:
-            message_lines = death_messages[self.death_cause]
+            self.renderer.add(display.blit(goal_text, goal_rect.topleft))
+
+        # 処理時間グラフ（F3で表示切り替え。内部解像度の大きさで描く）
+        if self.profiler.enabled:
+            graph_rect = display.to_render(PROFILER_GRAPH_RECT)
+            self.profiler.draw(self.screen, graph_rect)
+            self.renderer.add(graph_rect)
+        # 種類ごとの障害物の数（F4で表示切り替え）
+        if self.lifecycle.enabled:
+            graph_rect = display.to_render(ENTITY_GRAPH_RECT)
+            self.lifecycle.draw(self.screen, graph_rect)
+            self.renderer.add(graph_rect)
+        self.profiler.mark('hud')
+
+        self.renderer.present()
+        self.profiler.mark('flip')
+
+    def compose_stage_clear(self, surface):
+        """ステージクリア画面の静的な部分"""
+        # 現在のステージの背景を表示
+        if self.stage in self.bg_images:
+            surface.blit(self.bg_images[self.stage], (0, 0))
+        
+        # 半透明オーバーレイ
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((255, 255, 100, 150))
+        surface.blit(overlay, (0, 0))
+        
+        # クリアテキスト
+        clear_text = text_cache.render(self.jp_font_large, f"Stage {self.stage} Clear!", YELLOW)
+        clear_rect = clear_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
+        surface.blit(clear_text, clear_rect)
+        
+        # 次へ案内
+        next_text = text_cache.render(self.jp_font_medium, "Enter または Space で次のステージへ", WHITE)
+        next_rect = next_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
+        surface.blit(next_text, next_rect)
+
+    def compose_death_message(self, surface, message_lines):
+        """ゲームオーバー第1段階（死因別メッセージ）の静的な部分"""
+        # 背景（現在のステージ）
+        if self.stage in self.bg_images:
+            surface.blit(self.bg_images[self.stage], (0, 0))
         else:
-            message_lines = ["やられてしまった...", ""]
-        
-        # 第1段階：死因別メッセージ
-        waiting = True
-        while waiting:
-            self.clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    waiting = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                        waiting = False
-            
-            # 背景（現在のステージ）
-            if self.stage in self.bg_images:
-                self.screen.blit(self.bg_images[self.stage], (0, 0))
-            else:
-                self.screen.fill(BLACK)
-            
-            self.all_sprites.draw(self.screen)
-            
-            # 専用画像を表示
-            if self.death_cause in self.death_images and self.death_images[self.death_cause]:
-                target_img = self.death_images[self.death_cause]
-                # 画像を大きく表示（400x320）
-                img_rect = target_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-                self.screen.blit(target_img, img_rect)
-            else:
-                # 画像がない場合はタイトル画像を大きく表示
-                target_img = pygame.transform.scale(self.title_image, (300, 300))
-                img_rect = target_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-                self.screen.blit(target_img, img_rect)
-            
-            # テキストボックス
-            box_height = 120
-            box_rect = pygame.Rect(20, SCREEN_HEIGHT - box_height - 20, SCREEN_WIDTH - 40, box_height)
-            box_surface = pygame.Surface((box_rect.width, box_rect.height), pygame.SRCALPHA)
-            box_surface.fill((100, 0, 0, 200))  # 赤っぽい
-            self.screen.blit(box_surface, box_rect.topleft)
-            pygame.draw.rect(self.screen, RED, box_rect, 3, border_radius=10)
-            
-            # メッセージ表示
-            y_offset = box_rect.top + 20
-            for line in message_lines:
-                if line:
-                    text_surface = self.jp_font_medium.render(line, True, WHITE)
-                    self.screen.blit(text_surface, (box_rect.left + 20, y_offset))
-                    y_offset += 35
-            
-            hint_text = self.jp_font_small.render("Enter または Space で次へ", True, YELLOW)
-            hint_rect = hint_text.get_rect(bottomright=(box_rect.right - 10, box_rect.bottom - 10))
-            self.screen.blit(hint_text, hint_rect)
-            
-            pygame.display.flip()
-        
-        # 第2段階：ゲームオーバー表示
-        waiting = True
-        while waiting:
-            self.clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    waiting = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        # タイトル画面に戻る
-                        self.all_sprites.empty()
-                        self.obstacles.empty()
-                        self.stage = 1
-                        self.state = "title"
-                        waiting = False
-                    if event.key == pygame.K_r:
-                        # リスタート
-                        self.all_sprites.empty()
-                        self.obstacles.empty()
-                        if self.stage == 1:
-                            # ステージ1で死んだ場合はタイトルへ
-                            self.stage = 1
-                            self.state = "title"
-                        else:
-                            # ステージ2からやり直す
-                            self.stage = 2
-                            self.new_game()
-                        waiting = False
-                    if event.key == pygame.K_q:
-                        self.running = False
-                        waiting = False
-            
-            # sea5背景を表示 (ゲームオーバー用)
-            if 'gameover' in self.bg_images:
-                self.screen.blit(self.bg_images['gameover'], (0, 0))
-            else:
-                self.screen.fill(BLACK)
-            
-            # ゲームオーバーテキスト
-            text = self.jp_font_large.render("GAME OVER", True, RED)
-            rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
-            self.screen.blit(text, rect)
-            
-            # 操作案内
-            if self.stage == 1:
-                retry_text = self.jp_font_medium.render("Space: タイトルへ | Q: 終了", True, WHITE)
-            else:
-                retry_text = self.jp_font_medium.render("Rを押すとリスタート | Space: タイトルへ", True, WHITE)
-            retry_rect = retry_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
-            self.screen.blit(retry_text, retry_rect)
-            
-            pygame.display.flip()
-
-    def game_clear_scene(self):
-        # クリア音再生
-        self.play_sound('clear')
-        
-        # ゲームクリア画面（2段階）
-        # 第1段階：空を見た感動
-        waiting = True
-        while waiting:
-            self.clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    waiting = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                        waiting = False
-            
-            # sea4背景を表示
-            self.screen.blit(self.bg_images[5], (0, 0))
-            
-            # テキストボックス
-            box_height = 100
-            box_rect = pygame.Rect(20, SCREEN_HEIGHT - box_height - 20, SCREEN_WIDTH - 40, box_height)
-            box_surface = pygame.Surface((box_rect.width, box_rect.height), pygame.SRCALPHA)
-            box_surface.fill((0, 0, 50, 200))
-            self.screen.blit(box_surface, box_rect.topleft)
-            pygame.draw.rect(self.screen, WHITE, box_rect, 3, border_radius=10)
-            
-            # テキスト
-            text_surface = self.jp_font_medium.render("うわー、すごい！これが空か～！", True, WHITE)
-            self.screen.blit(text_surface, (box_rect.left + 20, box_rect.top + 20))
-            
-            hint_text = self.jp_font_small.render("Enter または Space で次へ", True, YELLOW)
-            hint_rect = hint_text.get_rect(bottomright=(box_rect.right - 10, box_rect.bottom - 10))
-            self.screen.blit(hint_text, hint_rect)
-            
-            pygame.display.flip()
-        
-        # 第2段階：ゲームクリア表示
-        waiting = True
-        while waiting:
-            self.clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    waiting = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_t:
-                        self.all_sprites.empty()
-                        self.obstacles.empty()
-                        self.stage = 1
-                        self.state = "title"
-                        waiting = False
-                    if event.key == pygame.K_q:
-                        self.running = False
-                        waiting = False
-            
-            # クリア画面の描画
-            self.screen.blit(self.bg_images[5], (0, 0))
-            
-            # 半透明オーバーレイ
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((255, 255, 100, 80))
-            self.screen.blit(overlay, (0, 0))
-            
-            # クリアテキスト
-            clear_text = self.jp_font_large.render("GAME CLEAR!", True, YELLOW)
-            clear_rect = clear_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
-            self.screen.blit(clear_text, clear_rect)
-            
-            # クラゲ画像
-            image_rect = self.title_image.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
-            self.screen.blit(self.title_image, image_rect)
-            
-            # 操作案内
-            help_text = self.jp_font_small.render("T: タイトルへ | Q: 終了", True, WHITE)
-            help_rect = help_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
-            self.screen.blit(help_text, help_rect)
-            
-            pygame.display.flip()
+            surface.fill(BLACK)
+        
+        self.all_sprites.draw(surface)
+        self.particles.draw(surface)
+        
+        # 専用画像を表示
+        if self.death_cause in self.death_images:
+            target_img = self.death_images[self.death_cause]
+            # 画像を大きく表示（400x320）
+            img_rect = target_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+            surface.blit(target_img, img_rect)
+        else:
+            # 画像がない場合はタイトル画像を大きく表示
+            target_img = pygame.transform.scale(self.title_image, (300, 300))
+            img_rect = target_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+            surface.blit(target_img, img_rect)
+        
+        # テキストボックス
+        box_height = 120
+        box_rect = pygame.Rect(20, SCREEN_HEIGHT - box_height - 20, SCREEN_WIDTH - 40, box_height)
+        box_surface = pygame.Surface((box_rect.width, box_rect.height), pygame.SRCALPHA)
+        box_surface.fill((100, 0, 0, 200))  # 赤っぽい
+        surface.blit(box_surface, box_rect.topleft)
+        pygame.draw.rect(surface, RED, box_rect, 3, border_radius=10)
+        
+        # メッセージ表示
+        text_block = text_cache.render_lines(self.jp_font_medium, [line for line in message_lines if line], WHITE, line_height=35)
+        surface.blit(text_block, (box_rect.left + 20, box_rect.top + 20))
+        
+        hint_text = text_cache.render(self.jp_font_small, "Enter または Space で次へ", YELLOW)
+        hint_rect = hint_text.get_rect(bottomright=(box_rect.right - 10, box_rect.bottom - 10))
+        surface.blit(hint_text, hint_rect)
 
+    def compose_game_over(self, surface):
+        """ゲームオーバー第2段階の静的な部分"""
+        # sea5背景を表示 (ゲームオーバー用)
+        if 'gameover' in self.bg_images:
+            surface.blit(self.bg_images['gameover'], (0, 0))
+        else:
+            surface.fill(BLACK)
+        
+        # ゲームオーバーテキスト
+        text = text_cache.render(self.jp_font_large, "GAME OVER", RED)
+        rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
+        surface.blit(text, rect)
+        
+        # 操作案内
+        if self.stage == 1:
+            retry_text = text_cache.render(self.jp_font_medium, "Space: タイトルへ | Q: 終了", WHITE)
+        else:
+            retry_text = text_cache.render(self.jp_font_medium, "Rを押すとリスタート | Space: タイトルへ", WHITE)
+        retry_rect = retry_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
+        surface.blit(retry_text, retry_rect)
+
+    def compose_sky(self, surface):
+        """ゲームクリア第1段階（空を見た感動）の静的な部分"""
+        # sea4背景を表示
+        surface.blit(self.bg_images[self.max_stage], (0, 0))
+        
+        # テキストボックス
+        box_height = 100
+        box_rect = pygame.Rect(20, SCREEN_HEIGHT - box_height - 20, SCREEN_WIDTH - 40, box_height)
+        box_surface = pygame.Surface((box_rect.width, box_rect.height), pygame.SRCALPHA)
+        box_surface.fill((0, 0, 50, 200))
+        surface.blit(box_surface, box_rect.topleft)
+        pygame.draw.rect(surface, WHITE, box_rect, 3, border_radius=10)
+        
+        # テキスト
+        text_surface = text_cache.render(self.jp_font_medium, "うわー、すごい！これが空か～！", WHITE)
+        surface.blit(text_surface, (box_rect.left + 20, box_rect.top + 20))
+        
+        hint_text = text_cache.render(self.jp_font_small, "Enter または Space で次へ", YELLOW)
+        hint_rect = hint_text.get_rect(bottomright=(box_rect.right - 10, box_rect.bottom - 10))
+        surface.blit(hint_text, hint_rect)
+
+    def compose_game_clear(self, surface):
+        """ゲームクリア第2段階の静的な部分"""
+        # クリア画面の描画
+        surface.blit(self.bg_images[self.max_stage], (0, 0))
+        
+        # 半透明オーバーレイ
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((255, 255, 100, 80))
+        surface.blit(overlay, (0, 0))
+        
+        # クリアテキスト
+        clear_text = text_cache.render(self.jp_font_large, "GAME CLEAR!", YELLOW)
+        clear_rect = clear_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
+        surface.blit(clear_text, clear_rect)
+        
+        # クラゲ画像
+        image_rect = self.title_image.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
+        surface.blit(self.title_image, image_rect)
+        
+        # 操作案内
+        help_text = text_cache.render(self.jp_font_small, "T: タイトルへ | Q: 終了", WHITE)
+        help_rect = help_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
+        surface.blit(help_text, help_rect)
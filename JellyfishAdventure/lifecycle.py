@@ -0,0 +1,151 @@
+import heapq
+import pygame
+import numpy
+from collections import Counter
+from settings import *
+
+# グラフの色（stages.json の種類の名前ごと）
+KIND_COLORS = {
+    'seaweed': (0, 220, 0),
+    'sunfish': (255, 140, 0),
+    'turtle': (0, 200, 255),
+    'waste': (200, 200, 200),
+}
+
+class EntityLifecycle:
+    """障害物の寿命と、種類ごとにいる数の記録
+
+    track() で出した障害物を、寿命の切れる時刻のヒープに積む。expire() は
+    先頭（一番早く切れるもの）を見て、時刻を過ぎたものだけ kill() する。
+    画面外に出た・ステージが終わったなどで先に消えたものや、プールで使い回されて
+    別の障害物になったものは、取り出したときに expires_at が違うので何もしない。
+    sample() で種類ごとの数を ENTITY_SAMPLE_MS ごとに history 件まで残し、
+    draw() で折れ線グラフにする（F4で表示切り替え）。
+    kinds は {種類の名前: クラス}（game.OBSTACLE_CLASSES）。
+    """
+    def __init__(self, kinds, lifetimes=OBSTACLE_LIFETIMES, history=ENTITY_HISTORY, enabled=False):
+        self.kinds = list(kinds)
+        self.kind_index = {cls: i for i, cls in enumerate(kinds.values())}
+        self.kind_names = {cls: kind for kind, cls in kinds.items()}
+        self.lifetimes = lifetimes
+        self.enabled = enabled
+        self.heap = []             # (消える時刻, 通し番号, スプライト)
+        self.serial = 0
+        self.expired = Counter()   # 寿命で消した数
+        self.history = history
+        self.samples = numpy.zeros((history, len(self.kinds)), dtype=numpy.int32)
+        self.index = 0             # 次に書き込む行
+        self.count = 0             # 記録した回数
+        self.next_sample = 0
+        self.peak = numpy.zeros(len(self.kinds), dtype=numpy.int32)
+        self.font = None
+        self.graph = None          # 前回描いたグラフ
+        self.graph_count = -1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def track(self, sprite, kind, now):
+        """出した障害物に寿命を付ける（寿命なしの種類は何もしない）"""
+        lifetime = self.lifetimes.get(kind)
+        if lifetime is None:
+            sprite.expires_at = None
+            return
+        sprite.expires_at = now + lifetime
+        self.serial += 1
+        heapq.heappush(self.heap, (sprite.expires_at, self.serial, sprite))
+
+    def expire(self, now):
+        """寿命の切れた障害物を消す"""
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, sprite = heapq.heappop(heap)
+            if sprite.expires_at == expires_at and sprite.alive():
+                sprite.expires_at = None
+                sprite.kill()
+                self.expired[self.kind_names.get(type(sprite))] += 1
+
+    def clear(self):
+        """ステージを片付けたとき（残った予定はもう要らない）"""
+        self.heap.clear()
+
+    def sample(self, now, sprites):
+        """ENTITY_SAMPLE_MS ごとに種類ごとの数を数えて残す"""
+        if now < self.next_sample:
+            return
+        self.next_sample = now + ENTITY_SAMPLE_MS
+        row = self.samples[self.index]  # 一番古い記録の行に上書きする
+        row[:] = 0
+        kind_index = self.kind_index
+        for sprite in sprites:
+            i = kind_index.get(type(sprite))
+            if i is not None:
+                row[i] += 1
+        self.index = (self.index + 1) % self.history
+        self.count += 1
+        numpy.maximum(self.peak, row, out=self.peak)
+
+    def recent(self, count=None):
+        """古い順に並べた直近の記録 (回数, 種類数)"""
+        count = min(count or self.history, self.count, self.history)
+        rows = numpy.roll(self.samples, -self.index, axis=0)
+        return rows[self.history - count:]
+
+    def live(self):
+        """最後に数えた種類ごとの数"""
+        rows = self.recent(1)
+        if len(rows) == 0:
+            return {kind: 0 for kind in self.kinds}
+        return dict(zip(self.kinds, rows[0].tolist()))
+
+    def stats(self):
+        return {
+            'live': self.live(),
+            'peak': dict(zip(self.kinds, self.peak.tolist())),
+            'expired': dict(self.expired),
+            'scheduled': len(self.heap),
+        }
+
+    def draw(self, surface, rect):
+        """直近の種類ごとの数を rect に折れ線で描く（数えたときだけ描き直す）"""
+        if not self.enabled:
+            return
+        rect = pygame.Rect(rect)
+        if self.graph is None or self.graph.get_size() != rect.size or self.graph_count != self.count:
+            self.graph = self.render_graph(rect.size)
+            self.graph_count = self.count
+        surface.blit(self.graph, rect.topleft)
+
+    def render_graph(self, size):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 16)
+
+        width, height = size
+        graph = pygame.Surface(size, pygame.SRCALPHA)
+        graph.fill((0, 0, 0, 160))
+
+        graph_height = height - 14
+        rows = self.recent(width // 2)
+        # 縦軸は予算か、それを超えていれば直近の最大まで
+        top = max(OBSTACLE_BUDGET, int(rows.sum(axis=1).max()) if len(rows) else 0, 1)
+        scale = (graph_height - 1) / top
+        x0 = width - len(rows) * 2
+        for i, kind in enumerate(self.kinds):
+            points = [(x0 + j * 2, graph_height - 1 - value * scale) for j, value in enumerate(rows[:, i].tolist())]
+            if len(points) >= 2:
+                pygame.draw.lines(graph, KIND_COLORS.get(kind, WHITE), False, points)
+        # 合計
+        totals = rows.sum(axis=1).tolist()
+        if len(totals) >= 2:
+            pygame.draw.lines(graph, WHITE, False, [(x0 + j * 2, graph_height - 1 - value * scale) for j, value in enumerate(totals)])
+
+        # 凡例（今の数）
+        x = 2
+        live = rows[-1].tolist() if len(rows) else [0] * len(self.kinds)
+        for kind, value in zip(self.kinds, live):
+            label = self.font.render(f"{kind} {value}", True, KIND_COLORS.get(kind, WHITE))
+            graph.blit(label, (x, height - 12))
+            x += label.get_width() + 6
+        label = self.font.render(f"total {sum(live)}", True, WHITE)
+        graph.blit(label, (x, height - 12))
+        return graph
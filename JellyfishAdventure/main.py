@@ -1,8 +1,9 @@
-
+import sys
 from game import Game
 
 def main():
-    game = Game()
+    # --record: 遊んだ入力を replays/ に記録する（replay.py で再生できる）
+    game = Game(record=True) if "--record" in sys.argv[1:] else Game()
     game.run()
 
 if __name__ == "__main__":
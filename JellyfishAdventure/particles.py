@@ -0,0 +1,115 @@
+import pygame
+import numpy
+from settings import *
+from atlas import sprite_atlas
+
+class ParticleSystem:
+    """泡パーティクルをNumPy配列でまとめて管理する
+
+    位置・速度・経過フレーム・寿命・半径を配列で持ち、update() で全部を一度に進める。
+    半径ごとの円は最初に一度だけ描いておき、draw() では blits でまとめて描画する。
+    生きているパーティクルは常に配列の先頭 count 個に詰めておく。
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY, max_radius=8, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0  # 容量オーバーで出せなかった数
+        self.pos = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.vel = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.timer = numpy.zeros(capacity, dtype=numpy.int32)
+        self.life_time = numpy.zeros(capacity, dtype=numpy.int32)
+        self.radius = numpy.zeros(capacity, dtype=numpy.int32)
+        # update() の途中の計算に使う作り置きの配列（毎フレーム配列を作らない）
+        self.scratch = numpy.zeros(capacity, dtype=numpy.float64)
+        self.alive = numpy.zeros(capacity, dtype=bool)
+        self.visible = numpy.zeros(capacity, dtype=bool)
+        self.rng = numpy.random.default_rng(seed)
+
+        # 半径ごとの半透明の白い円
+        self.images = {}
+        for r in range(1, max_radius + 1):
+            image = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+            pygame.draw.circle(image, (255, 255, 255, 150), (r, r), r)
+            # 一様な半透明なのでアトラスではカラーキー+RLEになる
+            self.images[r] = sprite_atlas.add(('bubble', r), image)
+        self.max_radius = max_radius
+
+    def emit(self, pos, count=1, speed=(1, 3), radius=(2, 6), spread=0):
+        """pos の周りに泡を count 個出す（speed は上昇速度、radius は半径の範囲）"""
+        want = count
+        count = min(count, self.capacity - self.count)
+        self.dropped += want - max(count, 0)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        rng = self.rng
+        self.pos[start:end, 0] = pos[0]
+        self.pos[start:end, 1] = pos[1]
+        if spread:
+            self.pos[start:end] += rng.integers(-spread, spread, size=(count, 2), endpoint=True)
+        self.vel[start:end, 0] = rng.uniform(-0.5, 0.5, count)
+        self.vel[start:end, 1] = -rng.uniform(speed[0], speed[1], count)
+        self.timer[start:end] = 0
+        self.life_time[start:end] = rng.integers(60, 120, count, endpoint=True)  # フレーム数
+        self.radius[start:end] = numpy.clip(rng.integers(radius[0], radius[1], count, endpoint=True), 1, self.max_radius)
+        self.count = end
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        timer = self.timer[:n]
+        scratch = self.scratch[:n]
+        pos += self.vel[:n]
+        # ゆらゆら（sin(timer * 0.1) * 0.5）
+        numpy.multiply(timer, 0.1, out=scratch)
+        numpy.sin(scratch, out=scratch)
+        scratch *= 0.5
+        pos[:, 0] += scratch
+        timer += 1
+
+        # 寿命切れ・画面上に出たものを消して、生きているものを先頭に詰める
+        alive = numpy.less_equal(timer, self.life_time[:n], out=self.alive[:n])
+        numpy.add(pos[:, 1], self.radius[:n], out=scratch)
+        alive &= numpy.greater_equal(scratch, 0, out=self.visible[:n])
+        if alive.all():
+            return
+        keep = numpy.flatnonzero(alive)
+        m = len(keep)
+        for array in (self.pos, self.vel, self.timer, self.life_time, self.radius):
+            array[:m] = array[keep]
+        self.count = m
+
+    def draw(self, surface, scale=(1, 1)):
+        """泡を描く（scale は内部解像度と論理解像度の比。半径は描いてある円から近いものを選ぶ）"""
+        n = self.count
+        if n == 0:
+            return
+        radius = self.radius[:n]
+        pos = self.pos[:n]
+        if scale != (1, 1):
+            pos = pos * numpy.array(scale, dtype=numpy.float32)
+            radius = numpy.clip(numpy.rint(radius * scale[0]), 1, self.max_radius).astype(numpy.int32)
+        topleft = pos.astype(numpy.int32) - radius[:, None]
+        images = self.images
+        surface.blits([(images[r], (x, y)) for r, (x, y) in zip(radius.tolist(), topleft.tolist())], doreturn=False)
+
+    def bounds(self):
+        """全部の泡を囲む Rect（泡がなければ None）"""
+        n = self.count
+        if n == 0:
+            return None
+        radius = self.radius[:n]
+        pos = self.pos[:n].astype(numpy.int32)
+        left = int((pos[:, 0] - radius).min())
+        top = int((pos[:, 1] - radius).min())
+        right = int((pos[:, 0] + radius).max())
+        bottom = int((pos[:, 1] + radius).max())
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def clear(self):
+        self.count = 0
+
+    def __len__(self):
+        return self.count
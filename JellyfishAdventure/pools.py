@@ -0,0 +1,73 @@
+from settings import *
+
+class SpritePool:
+    """使い終わったスプライトを取っておき、作り直さずに使い回す（1種類ぶん）
+
+    acquire(*args) は空きがあれば sprite.reset(*args) で作り直した直後と同じ状態に
+    戻して返し、無ければ cls(*args) で新しく作る。スプライトがどのグループにも
+    属さなくなったとき（kill() や Group.empty()）に、スプライト側から release() される。
+    空きが capacity を超えた分は捨てる。
+    """
+    def __init__(self, cls, capacity=POOL_CAPACITY):
+        self.cls = cls
+        self.capacity = capacity
+        self.free = []
+        self.in_use = 0
+        self.high_water = 0  # 同時に使われていた最大数
+        self.created = 0     # 新しく作った数
+        self.reused = 0      # 使い回した数
+        self.discarded = 0   # 空きが一杯で捨てた数
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.cls(*args)
+            sprite.pool = self
+            self.created += 1
+        sprite.pooled = False
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return sprite
+
+    def release(self, sprite):
+        if sprite.pooled:
+            return
+        sprite.pooled = True
+        self.in_use -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+        else:
+            self.discarded += 1
+
+    def stats(self):
+        return {
+            'capacity': self.capacity,
+            'free': len(self.free),
+            'in_use': self.in_use,
+            'high_water': self.high_water,
+            'created': self.created,
+            'reused': self.reused,
+            'discarded': self.discarded,
+        }
+
+
+class PoolSet:
+    """種類ごとの SpritePool をまとめたもの
+
+    enabled=False なら acquire() は毎回新しく作るだけ（従来どおり）。
+    """
+    def __init__(self, classes, capacity=POOL_CAPACITY, enabled=True):
+        self.enabled = enabled
+        self.pools = {cls: SpritePool(cls, capacity) for cls in classes}
+
+    def acquire(self, cls, *args):
+        if not self.enabled:
+            return cls(*args)
+        return self.pools[cls].acquire(*args)
+
+    def stats(self):
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}
@@ -0,0 +1,144 @@
+import pygame
+import csv
+import time
+import numpy
+from settings import *
+
+# 計測する処理の区切り（この順に色分けしてグラフに積む）
+PHASES = ["events", "sprites", "spawn", "bubbles", "collision", "background", "draw", "hud", "scene", "flip"]
+PHASE_COLORS = {
+    "events": (120, 120, 120),
+    "sprites": (0, 200, 255),
+    "spawn": (0, 120, 255),
+    "bubbles": (200, 200, 255),
+    "collision": (255, 80, 80),
+    "background": (0, 160, 0),
+    "draw": (120, 255, 120),
+    "hud": (255, 255, 0),
+    "scene": (255, 150, 0),
+    "flip": (255, 0, 255),
+}
+
+class FrameProfiler:
+    """フレーム内の処理ごとの時間を測る
+
+    begin_frame() でフレームを始め、各処理の終わりで mark(処理名) を呼ぶと、
+    前の区切りからの経過時間がその処理に加算される。
+    直近 history フレーム分をリングバッファに残し、CSVにも書き出せる。
+    無効のときは mark() も begin_frame() もすぐ戻るだけ。
+    """
+    def __init__(self, history=PROFILER_HISTORY, enabled=False, csv_path=None):
+        self.enabled = enabled
+        self.history = history
+        self.samples = numpy.zeros((history, len(PHASES)), dtype=numpy.float32)  # ミリ秒
+        self.index = 0       # 次に書き込む行
+        self.frames = 0      # 記録したフレーム数
+        self.current = [0.0] * len(PHASES)
+        self.phase_index = {name: i for i, name in enumerate(PHASES)}
+        self.last = None
+        self.csv_file = None
+        self.csv_writer = None
+        self.font = None
+        self.labels = None
+        self.graph = None     # 前回描いたグラフ
+        self.graph_frame = 0
+        if csv_path:
+            self.start_csv(csv_path)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.last = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        if self.last is not None:
+            self.end_frame()
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        if not self.enabled or self.last is None:
+            return
+        now = time.perf_counter()
+        self.current[self.phase_index[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        row = self.current
+        self.samples[self.index] = row
+        self.index = (self.index + 1) % self.history
+        self.frames += 1
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([self.frames, f"{sum(row):.4f}"] + [f"{value:.4f}" for value in row])
+            if self.frames % 60 == 0:
+                self.csv_file.flush()
+        self.current = [0.0] * len(PHASES)
+
+    def recent(self, count=None):
+        """古い順に並べた直近のサンプル (フレーム数, 処理数)"""
+        count = min(count or self.history, self.frames, self.history)
+        rows = numpy.roll(self.samples, -self.index, axis=0)
+        return rows[self.history - count:]
+
+    def averages(self):
+        rows = self.recent()
+        if len(rows) == 0:
+            return {}
+        return dict(zip(PHASES, rows.mean(axis=0).tolist()))
+
+    def start_csv(self, path):
+        self.stop_csv()
+        self.csv_file = open(path, "w", newline="", encoding="utf-8")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(["frame", "total_ms"] + [f"{name}_ms" for name in PHASES])
+
+    def stop_csv(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = None
+        self.csv_writer = None
+
+    def draw(self, surface, rect, budget_ms=1000 / FPS, refresh_frames=10):
+        """直近フレームの積み上げグラフを rect に描く（線は1フレームの目安時間）
+
+        グラフは refresh_frames フレームごとに描き直し、それ以外は前回の画像を貼るだけ。
+        """
+        if not self.enabled:
+            return
+        rect = pygame.Rect(rect)
+        if self.graph is None or self.graph.get_size() != rect.size or self.frames - self.graph_frame >= refresh_frames:
+            self.graph = self.render_graph(rect.size, budget_ms)
+            self.graph_frame = self.frames
+        surface.blit(self.graph, rect.topleft)
+
+    def render_graph(self, size, budget_ms):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 16)
+            self.labels = [self.font.render(name, True, PHASE_COLORS[name]) for name in PHASES]
+
+        width, height = size
+        graph = pygame.Surface(size, pygame.SRCALPHA)
+        graph.fill((0, 0, 0, 160))
+
+        graph_height = height - 14
+        scale = graph_height / (budget_ms * 2)  # 目安時間の2倍までを表示
+        rows = self.recent(width)
+        x = width - len(rows)
+        for row in rows.tolist():
+            y = graph_height
+            for name, value in zip(PHASES, row):
+                bar = value * scale
+                if bar >= 0.5:
+                    top = max(0, y - bar)
+                    pygame.draw.line(graph, PHASE_COLORS[name], (x, y), (x, top))
+                    y = top
+            x += 1
+        budget_y = graph_height - budget_ms * scale
+        pygame.draw.line(graph, WHITE, (0, budget_y), (width - 1, budget_y))
+
+        # 凡例
+        x = 2
+        for label in self.labels:
+            graph.blit(label, (x, height - 12))
+            x += label.get_width() + 4
+        return graph
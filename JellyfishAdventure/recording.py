@@ -0,0 +1,197 @@
+import os
+import struct
+import pygame
+from settings import *
+
+# 記録ファイルの置き場所（起動したディレクトリによらずゲームのフォルダの下）
+RECORD_PATH = os.path.join(os.path.dirname(__file__), RECORD_DIR)
+
+# 入力記録ファイルの形式
+# ヘッダ: マジック, バージョン, 物理ステップ数/秒, 乱数シード
+# 以降はレコードの並び: 種類(1バイト), ステップ番号(4バイト), 種類ごとの中身
+RECORD_MAGIC = b"JFRC"
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct("<4sHHQ")
+RECORD_PREFIX = struct.Struct("<BI")
+
+SPACE = 1         # スペースの押下・解放 (押されているか)
+MOUSE = 2         # ダッシュ時のマウス座標 (x, y)
+START = 3         # new_game() (ステージ)
+TUTORIAL_END = 4  # チュートリアル終了（障害物の初期配置）
+GAME_OVER = 5     # ゲームオーバー (ステージ, 原因)
+GAME_CLEAR = 6    # 全ステージクリア
+END = 7           # 記録の終わり
+
+PAYLOADS = {
+    SPACE: struct.Struct("<B"),
+    MOUSE: struct.Struct("<hh"),
+    START: struct.Struct("<B"),
+    TUTORIAL_END: struct.Struct(""),
+    GAME_OVER: struct.Struct("<BB"),
+    GAME_CLEAR: struct.Struct(""),
+    END: struct.Struct(""),
+}
+DEATH_CAUSES = [None, 'seaweed', 'sunfish', 'turtle', 'waste']
+
+
+class InputRecorder:
+    """入力と場面の切り替わりを、起きた物理ステップの番号付きでファイルに書き続ける
+
+    1レコード数バイトで、書いたものはメモリに残さない（バッファ分だけ）。
+    同じシードでこの入力を与えれば同じ展開になる（replay() で再現できる）。
+    """
+    def __init__(self, path, seed, clock):
+        self.path = path
+        self.clock = clock  # 物理ステップごとに進む SimClock
+        self.file = open(path, "wb")
+        self.file.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, PHYSICS_HZ, seed))
+        self.space = False
+
+    def write(self, kind, *values):
+        if self.file is None:
+            return
+        self.file.write(RECORD_PREFIX.pack(kind, self.clock.frame) + PAYLOADS[kind].pack(*values))
+        if kind not in (SPACE, MOUSE):
+            # 場面の切り替わりでは書き出しておく（落ちても直前までは残る）
+            self.file.flush()
+
+    def game_over(self, stage, cause):
+        self.write(GAME_OVER, stage, DEATH_CAUSES.index(cause) if cause in DEATH_CAUSES else 0)
+
+    def close(self):
+        if self.file is not None:
+            self.write(END)
+            self.file.close()
+            self.file = None
+
+
+class RecordingInput:
+    """別の入力（通常は LiveInput）をそのまま返しつつ、変化を InputRecorder に書く"""
+    def __init__(self, inner, recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def update(self, frame):
+        self.inner.update(frame)
+
+    def space_pressed(self):
+        pressed = bool(self.inner.space_pressed())
+        if pressed != self.recorder.space:
+            self.recorder.space = pressed
+            self.recorder.write(SPACE, pressed)
+        return pressed
+
+    def mouse_pos(self):
+        # Jellyfish.dash() だけが呼ぶので、ダッシュの向きを決めた座標が残る
+        x, y = self.inner.mouse_pos()
+        self.recorder.write(MOUSE, x, y)
+        return x, y
+
+
+class ReplayInput:
+    """記録から復元した入力（replay() が各ステップの前に設定する）"""
+    def __init__(self):
+        self.space = False
+        self.mouse = (SCREEN_WIDTH // 2, 0)
+
+    def update(self, frame):
+        pass
+
+    def space_pressed(self):
+        return self.space
+
+    def mouse_pos(self):
+        return self.mouse
+
+
+def read_header(file):
+    magic, version, hz, seed = RECORD_HEADER.unpack(file.read(RECORD_HEADER.size))
+    if magic != RECORD_MAGIC or version != RECORD_VERSION:
+        raise ValueError("入力記録ファイルではありません")
+    return hz, seed
+
+def read_records(file):
+    """(種類, ステップ番号, 中身のタプル) を順に返す（ファイル全体は読み込まない）"""
+    while True:
+        prefix = file.read(RECORD_PREFIX.size)
+        if len(prefix) < RECORD_PREFIX.size:
+            return
+        kind, step = RECORD_PREFIX.unpack(prefix)
+        payload = PAYLOADS[kind]
+        yield kind, step, payload.unpack(file.read(payload.size))
+
+
+def replay(path, watch=False, on_event=None):
+    """記録どおりに入力を与えてゲームを進め直し、記録された結果と一致したかを返す
+
+    watch=False ならヘッドレス・描画なしでCPUの速さいっぱいに進める。
+    watch=True ならウィンドウに描きながら等倍で進める。
+    on_event(種類, ステップ番号, 中身, game) を渡すと場面の切り替わりごとに呼ぶ。
+    戻り値は {'steps', 'game_overs', 'mismatches', 'game'}。
+    """
+    from game import Game
+    from scenes import PlayScene
+
+    controls = ReplayInput()
+    with open(path, "rb") as file:
+        hz, seed = read_header(file)
+        if hz != PHYSICS_HZ:
+            raise ValueError(f"物理ステップ数が違います（記録 {hz}, 現在 {PHYSICS_HZ}）")
+        game = Game(headless=True, seed=seed, controls=controls, render=watch, show=watch)
+        game.change_scene(PlayScene(game))
+        pacing = pygame.time.Clock() if watch else None
+        game_overs = 0
+        mismatches = []
+
+        def step():
+            game.clock.tick(hz)
+            game.frame += 1
+            game.update()
+            if watch:
+                game.events()
+                game.draw()
+                pacing.tick(hz)
+
+        for kind, tick, values in read_records(file):
+            if kind in (SPACE, MOUSE):
+                # 入力はそのステップの update() の前に反映する
+                while game.clock.frame < tick - 1:
+                    step()
+                if kind == SPACE:
+                    controls.space = bool(values[0])
+                else:
+                    controls.mouse = values
+                continue
+
+            # 場面の切り替わりはそのステップの update() の後に起きている
+            while game.clock.frame < tick:
+                step()
+            if kind == START:
+                stage = values[0]
+                # ステージクリアでの new_game() はリプレイ側の update() でも起きている
+                if not (game.stage == stage and game.stage_start_step == tick):
+                    game.clear_sprites()
+                    game.stage = stage
+                    game.new_game()
+                game.running = True
+                game.result = None
+            elif kind == TUTORIAL_END:
+                game.tutorial_active = False
+                game.spawn_initial_obstacles()
+            elif kind == GAME_OVER:
+                game_overs += 1
+                stage, cause = values
+                if game.result != 'game_over' or game.stage != stage or game.death_cause != DEATH_CAUSES[cause]:
+                    mismatches.append((tick, 'game_over', game.result, game.stage, game.death_cause))
+            elif kind == GAME_CLEAR:
+                if game.result != 'clear':
+                    mismatches.append((tick, 'clear', game.result, game.stage, None))
+            if on_event is not None:
+                on_event(kind, tick, values, game)
+            if kind == END:
+                break
+            if watch and not game.running and game.result is None:
+                break  # ウィンドウを閉じた
+
+    game.loader.shutdown()
+    return {'steps': game.clock.frame, 'game_overs': game_overs, 'mismatches': mismatches, 'game': game}
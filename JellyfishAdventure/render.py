@@ -0,0 +1,101 @@
+import pygame
+from settings import *
+
+class DirtyRenderer:
+    """変わった部分だけ描き直して画面に送る描画（プレイ中の画面用）
+
+    前のフレームで描いた場所を背景で塗り戻し、今のフレームで描いた場所と合わせて
+    pygame.display.update(rects) で送る。背景が変わったとき・invalidate() の後・
+    描き直す面積が画面の max_dirty_ratio を超えるときは全体を描いて flip() する。
+    enabled=False なら毎フレーム全体を描いて flip() する（従来どおり）。
+    display（display.Display）を渡すとそれを通してウィンドウに出す。
+    """
+    def __init__(self, screen, enabled=True, max_dirty_ratio=DIRTY_RECT_MAX_RATIO, display=None):
+        self.screen = screen
+        self.display = display if display is not None else pygame.display
+        self.enabled = enabled
+        self.screen_rect = screen.get_rect()
+        self.max_dirty_area = self.screen_rect.width * self.screen_rect.height * max_dirty_ratio
+        self.background = None
+        self.full_redraw = True
+        self.prev_rects = []
+        self.rects = []
+        # 直近フレームの統計
+        self.dirty_area = 0
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """次のフレームは全体を描き直す（別の場面が画面を上書きした後など）"""
+        self.full_redraw = True
+
+    def begin(self, background):
+        """背景を描く（全体、または前フレームで描いた場所だけ）"""
+        if background is not self.background:
+            self.background = background
+            self.full_redraw = True
+        if self.full_redraw or not self.enabled:
+            self.blit_background(self.screen_rect)
+        else:
+            for rect in self.prev_rects:
+                self.blit_background(rect)
+        self.rects = []
+
+    def blit_background(self, rect):
+        if self.background is None:
+            self.screen.fill((0, 0, 50), rect)
+        else:
+            self.screen.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        """今のフレームで描いた場所を登録する"""
+        if not self.enabled or rect is None:
+            return
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def add_group(self, group):
+        """Group.draw() の後に呼ぶと、描いた各スプライトの場所を登録する"""
+        if not self.enabled:
+            return
+        for rect in group.spritedict.values():
+            if rect:
+                self.add(rect)
+
+    def present(self):
+        rects = self.prev_rects + self.rects
+        self.dirty_area = sum(rect.width * rect.height for rect in rects)
+        if not self.enabled or self.full_redraw or self.dirty_area > self.max_dirty_area:
+            self.display.flip()
+            self.full_frames += 1
+        else:
+            self.display.update(rects)
+            self.partial_frames += 1
+        self.full_redraw = False
+        self.prev_rects = self.rects
+        self.rects = []
+
+def draw_interpolated(group, surface, previous, alpha, display=None):
+    """Group.draw() と同じだが、previous[sprite] の位置から今の rect の位置へ
+    alpha (0〜1) の割合だけ進めた場所に描く（固定ステップの間の補間用）
+
+    previous に無いスプライト（このステップで出てきたもの）は今の位置に描く。
+    rect 自体は変えないので、当たり判定には影響しない。
+    display（display.Display）を渡すと、内部解像度に縮めた画像・座標で描く。
+    """
+    sprites = group.sprites()
+    blits = []
+    scaled = display is not None and display.scaled
+    for sprite in sprites:
+        x, y = sprite.rect.topleft
+        before = previous.get(sprite)
+        if before is not None:
+            x = round(before[0] + (x - before[0]) * alpha)
+            y = round(before[1] + (y - before[1]) * alpha)
+        if scaled:
+            blits.append((display.scale_image(sprite.image), display.to_render_pos((x, y))))
+        else:
+            blits.append((sprite.image, (x, y)))
+    group.spritedict.update(zip(sprites, surface.blits(blits)))
+    group.lostsprites = []
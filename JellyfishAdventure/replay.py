@@ -0,0 +1,53 @@
+"""記録した入力（recording.py、RECORD_INPUT か main.py --record で replays/ に書かれる）を再生するツール
+
+記録のシードで乱数を固定し、スペースとダッシュ時のマウス座標を記録から与えて
+ゲームを進め直す。既定ではヘッドレス・描画なしでCPUの速さいっぱいに進め、
+記録されたゲームオーバー・クリアがその通りに起きたかを確かめる。
+--watch ならウィンドウに描きながら等倍で再生する。
+
+使い方: python replay.py replays/20260101-120000.jfrec [--watch] [--events]
+"""
+import argparse
+import time
+
+from settings import *
+import recording
+
+EVENT_NAMES = {
+    recording.START: "start",
+    recording.TUTORIAL_END: "tutorial end",
+    recording.GAME_OVER: "game over",
+    recording.GAME_CLEAR: "game clear",
+    recording.END: "end",
+}
+
+def print_event(kind, tick, values, game):
+    detail = ""
+    if kind == recording.START:
+        detail = f" stage {values[0]}"
+    elif kind == recording.GAME_OVER:
+        detail = f" stage {values[0]} ({recording.DEATH_CAUSES[values[1]]})"
+    print(f"  {tick / PHYSICS_HZ:8.2f}s  {EVENT_NAMES[kind]}{detail}  hp={game.player.hp if getattr(game, 'player', None) else '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="記録ファイル")
+    parser.add_argument("--watch", action="store_true", help="ウィンドウに描きながら等倍で再生する")
+    parser.add_argument("--events", action="store_true", help="場面の切り替わりを表示する")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = recording.replay(args.path, watch=args.watch, on_event=print_event if args.events else None)
+    elapsed = time.perf_counter() - start
+    steps = result['steps']
+    print(f"{steps} steps ({steps / PHYSICS_HZ:.1f}s of play) replayed in {elapsed:.2f}s "
+          f"({steps / PHYSICS_HZ / max(elapsed, 1e-9):.0f}x)")
+    print(f"game overs: {result['game_overs']}")
+    if result['mismatches']:
+        for tick, expected, got, stage, cause in result['mismatches']:
+            print(f"  mismatch at step {tick}: recorded {expected}, replay {got} (stage {stage}, {cause})")
+    else:
+        print("replay matches the recording")
+
+if __name__ == "__main__":
+    main()
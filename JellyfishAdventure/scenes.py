@@ -0,0 +1,301 @@
+import pygame
+from settings import *
+from recording import TUTORIAL_END
+
+# 障害物別のゲームオーバーメッセージ
+DEATH_MESSAGES = {
+    'seaweed': ["うわ～～、絡まって動けないーー！", "海藻に絡まってしまった..."],
+    'waste': ["うわっ、なんだこれ！気持ち悪いよー！", "プラスチックごみに襲われてしまった..."],
+    'turtle': ["うわっ、やめろー！く、食べるなー、ぐわー！", "ウミガメに食べられてしまった..."],
+    'sunfish': ["や、やめろ、やめｒｒｒ、、、", "マンボウに食べられてしまった..."]
+}
+
+
+class Scene:
+    """場面の基本形。Game.run の1フレームごとに update() と draw() が呼ばれる
+
+    enter() は Game.change_scene() で切り替わった直後に1回だけ呼ばれる。
+    update(elapsed) の中で別の場面に切り替えたフレームは draw() を呼ばない。
+    fps は描画の上限（ヘッドレス実行では使わない）。
+    """
+    name = None
+    fps = FPS
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        pass
+
+    def update(self, elapsed):
+        pass
+
+    def draw(self):
+        pass
+
+
+class TitleScene(Scene):
+    name = "title"
+
+    def update(self, elapsed):
+        game = self.game
+        game.next_frame()
+        if game.headless:
+            # ヘッドレス実行ではすぐに始める
+            game.start_game()
+            return
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE or event.key == pygame.K_RETURN:
+                    game.start_game()
+                    return
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # ボタンのクリック判定
+                if game.start_button_rect.collidepoint(game.display.to_logical(event.pos)):
+                    game.start_game()
+                    return
+
+    def draw(self):
+        game = self.game
+        # 静的な画面なので一度だけ合成して使い回す
+        game.screen.blit(game.cached_layer('title', None, game.compose_title), (0, 0))
+        game.profiler.mark('scene')
+        game.display.flip()
+        game.profiler.mark('flip')
+
+
+class TutorialScene(Scene):
+    """ステージ1の最初の会話（プレイ中の一部なので name は playing）"""
+    name = "playing"
+
+    def update(self, elapsed):
+        game = self.game
+        game.next_frame()
+        if game.headless:
+            # ヘッドレス実行では会話を飛ばす
+            game.tutorial_active = False
+            game.spawn_initial_obstacles()
+            game.change_scene(PlayScene(game))
+            return
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
+                    game.tutorial_index += 1
+                    if game.tutorial_index >= len(game.tutorial_dialogues):
+                        game.tutorial_active = False
+                        game.renderer.invalidate()
+                        # チュートリアル終了後、障害物を配置
+                        game.spawn_initial_obstacles()
+                        game.record(TUTORIAL_END)
+                        game.change_scene(PlayScene(game))
+                        return
+
+    def draw(self):
+        game = self.game
+        # 会話ごとに一度だけ合成して使い回す
+        game.screen.blit(game.cached_layer('tutorial', (game.stage, game.tutorial_index), game.compose_tutorial), (0, 0))
+        game.profiler.mark('scene')
+        game.display.flip()
+        game.profiler.mark('flip')
+
+
+class PlayScene(Scene):
+    """プレイ中。物理を固定ステップで進め、描画はステップ間を補間する"""
+    name = "playing"
+    fps = RENDER_FPS
+
+    def enter(self):
+        # 他の場面にいた間の時間は進めない
+        self.game.accumulator = 0.0
+
+    def update(self, elapsed):
+        game = self.game
+        game.events()
+        steps = game.steps_due(elapsed)
+        for i in range(steps):
+            if INTERPOLATE and i == steps - 1:
+                game.remember_positions()
+            game.step()
+            if not game.running or game.scene is not self:
+                break
+
+    def draw(self):
+        self.game.draw(self.game.interpolation())
+
+
+class MenuScene(Scene):
+    """合成済みの静的な画面を出してキーを待つ場面の共通部分
+
+    self.pages は (合成関数, 引数のタプル) の並びで、next_page() で次の画面へ進む。
+    prepare(stage) で次のステージの準備（Game.prepare_stage）を始めると、
+    画面を出したまま1フレームに1段ずつ進め、終わったら then の場面へ移る。
+    """
+    def __init__(self, game):
+        super().__init__(game)
+        self.pages = []
+        self.page = 0
+        self.layer = None
+        self.preparation = None  # 次のステージの準備
+        self.then = None         # 準備が終わって移る場面（None なら準備だけ先に進めておく）
+
+    def enter(self):
+        self.compose_page()
+
+    def compose_page(self):
+        compose, args = self.pages[self.page]
+        self.layer = self.game.compose_layer(compose, *args)
+
+    def next_page(self):
+        self.page += 1
+        self.compose_page()
+
+    def prepare(self, stage):
+        self.preparation = self.game.prepare_stage(stage)
+
+    def update(self, elapsed):
+        game = self.game
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+            if event.type == pygame.KEYDOWN:
+                self.key_pressed(event.key)
+                if game.scene is not self or not game.running:
+                    return
+
+        if self.preparation is not None:
+            if next(self.preparation, True):
+                self.preparation = None
+        if self.preparation is None and self.then is not None:
+            game.change_scene(self.then())
+
+    def key_pressed(self, key):
+        pass
+
+    def draw(self):
+        game = self.game
+        game.screen.blit(self.layer, (0, 0))
+        game.profiler.mark('scene')
+        game.display.flip()
+        game.profiler.mark('flip')
+
+
+class StageClearScene(MenuScene):
+    """ステージクリア画面。表示している間に次のステージを準備しておく"""
+    name = "stage_clear"
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.pages = [(game.compose_stage_clear, ())]
+
+    def enter(self):
+        game = self.game
+        # クリア音再生
+        game.play_sound('clear')
+
+        if game.headless:
+            # ヘッドレス実行では待たずに次のステージへ
+            game.stage += 1
+            game.clear_sprites()
+            game.new_game()
+            game.change_scene(PlayScene(game))
+            return
+
+        # 静的な部分は入ったときに一度だけ合成する
+        super().enter()
+        self.prepare(game.stage + 1)
+
+    def key_pressed(self, key):
+        if key == pygame.K_RETURN or key == pygame.K_SPACE:
+            # 次のステージへ（準備が終わり次第）
+            self.then = lambda: PlayScene(self.game)
+
+
+class GameOverScene(MenuScene):
+    """ゲームオーバー（死因別メッセージ → ゲームオーバー表示）"""
+    name = "game_over"
+
+    def __init__(self, game):
+        super().__init__(game)
+        # デフォルトメッセージ
+        message_lines = DEATH_MESSAGES.get(game.death_cause, ["やられてしまった...", ""])
+        self.pages = [(game.compose_death_message, (message_lines,)), (game.compose_game_over, ())]
+
+    def enter(self):
+        game = self.game
+        # ゲームオーバー音再生
+        game.play_sound('gameover')
+
+        if game.headless:
+            game.result = 'game_over'
+            game.running = False
+            return
+        super().enter()
+
+    def key_pressed(self, key):
+        game = self.game
+        if self.page == 0:
+            # 第1段階：死因別メッセージ
+            if key == pygame.K_RETURN or key == pygame.K_SPACE:
+                self.next_page()
+            return
+        if self.preparation is not None:
+            return  # リスタートの準備中
+
+        # 第2段階：ゲームオーバー表示
+        if key == pygame.K_SPACE:
+            # タイトル画面に戻る
+            game.clear_sprites()
+            game.stage = 1
+            game.change_scene(TitleScene(game))
+        if key == pygame.K_r:
+            # リスタート
+            if game.stage == 1:
+                # ステージ1で死んだ場合はタイトルへ
+                game.clear_sprites()
+                game.change_scene(TitleScene(game))
+            else:
+                # ステージ2からやり直す
+                self.prepare(2)
+                self.then = lambda: PlayScene(game)
+        if key == pygame.K_q:
+            game.running = False
+
+
+class GameClearScene(MenuScene):
+    """ゲームクリア（空を見た感動 → ゲームクリア表示）"""
+    name = "game_clear"
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.pages = [(game.compose_sky, ()), (game.compose_game_clear, ())]
+
+    def enter(self):
+        game = self.game
+        # クリア音再生
+        game.play_sound('clear')
+
+        if game.headless:
+            game.result = 'clear'
+            game.running = False
+            return
+        super().enter()
+
+    def key_pressed(self, key):
+        game = self.game
+        if self.page == 0:
+            if key == pygame.K_RETURN or key == pygame.K_SPACE:
+                self.next_page()
+            return
+
+        if key == pygame.K_t:
+            game.clear_sprites()
+            game.stage = 1
+            game.change_scene(TitleScene(game))
+        if key == pygame.K_q:
+            game.running = False
@@ -1,8 +1,13 @@
 import pygame
 
 # 画面設定
-SCREEN_WIDTH = 800
+SCREEN_WIDTH = 800        # 論理解像度（ゲーム内の座標の単位）
 SCREEN_HEIGHT = 600
+# 内部解像度（実際に描く画面の大きさ）。小さくすると塗り・blit が減り、ウィンドウへは拡大して出す
+# 例: (600, 450) や (400, 300)。論理解像度と同じなら縮めずにそのまま描く
+RENDER_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+DISPLAY_MODE = "scaled"   # ウィンドウへの出し方: native（等倍）/ scaled（SDLが拡大）/ software（transform.scale で拡大）
+WINDOW_SIZE = (1600, 1200) # software のときのウィンドウの大きさ（scaled はSDLが決める）
 TITLE = "海流に負けるな！クラゲちゃん"
 FPS = 60
 
@@ -23,4 +28,105 @@ FRICTION = 0.93           # 摩擦（減衰） (修正: 0.95 -> 0.93)
 
 # ゲーム設定
 PLAYER_START_HP = 3
-OBSTACLE_SPAWN_RATE = 1000 # ミリ秒
+SPAWN_INTERVAL_SCALE = 1.0 # stages.json の出現間隔（interval）に掛ける倍率（sweep.py での調整用）
+OBSTACLE_BUDGET = 40       # 同時にいる障害物の上限（stages.json で max_obstacles を省いたステージ）
+# 出てから寿命で消えるまでの時間（ミリ秒、None なら寿命なし。ゴミは画面外に流れて消える）
+OBSTACLE_LIFETIMES = {
+    'seaweed': 20000,
+    'sunfish': 30000,
+    'turtle': 30000,
+    'waste': None,
+}
+OFFSCREEN_MARGIN = 50      # 画面の外にこれより離れた障害物は消す（ピクセル）
+
+# アセット設定
+SPRITE_CACHE_SIZE = 32    # 共有スプライトキャッシュの最大件数
+SPRITE_ATLAS_MODE = "rle"  # スプライト画像: alpha（個別のアルファ付き）/ atlas（シートにまとめる）/ rle（2値の透明はカラーキー+RLE）
+ATLAS_SHEET_SIZE = 512     # アトラスのシート1枚の大きさ（正方形）
+ATLAS_PADDING = 1          # シート上の画像どうしの間隔
+ATLAS_COLORKEY = (255, 0, 255)  # カラーキーのシートで透明を表す色
+USE_ASSET_PACK = True     # assets.pack があれば使う（無い・古い場合は個別ファイル）
+ASSET_PACK_FILE = "assets.pack"
+ASSET_LOADER_THREADS = 2 # 裏でアセットを読み込むスレッド数
+ASSET_MEMORY_BUDGET = 8 * 1024 * 1024  # 背景などの大きな画像を持っておく上限（バイト、今と次のステージの分は超えても持つ）
+
+# ステージ（背景・障害物の出現表・間隔・上限）は STAGES_FILE に書く（stages.py）
+STAGES_FILE = "stages.json"
+GAMEOVER_BACKGROUND = "sea5.jpg"  # ゲームオーバー画面の背景
+DEATH_IMAGE_SIZE = (500, 400)
+# チュートリアルで見せる障害物の画像 {種類: ファイル名}
+TUTORIAL_IMAGES = {
+    'seaweed': 'seaweed.png',
+    'sunfish': 'sunfish.png',
+    'turtle': 'turtle.png',
+    'waste': 'plastic_waste.png',
+}
+TUTORIAL_IMAGE_SIZE = (150, 150)
+# ゲームオーバー画面の死因別の画像 {死因: ファイル名}
+DEATH_IMAGES = {
+    'seaweed': 'jellyfish_seaweed.jpg',
+    'waste': 'jellyfish_plastic_waste.jpg',
+    'turtle': 'jellyfish_turtle.jpg',
+    'sunfish': 'jellyfish_sunfish.jpg',
+}
+PARTICLE_CAPACITY = 4096  # 同時に出せる泡の最大数
+COLLISION_CELL_SIZE = 128 # 当たり判定グリッドの1マスの大きさ（ピクセル）
+
+# 処理時間の計測（F3でグラフ表示を切り替え）
+PROFILER_ENABLED = False
+PROFILER_HISTORY = 240    # 残しておくフレーム数
+PROFILER_CSV = None       # ファイル名を入れるとフレームごとの時間をCSVに書き出す
+PROFILER_GRAPH_RECT = (220, 10, 460, 80)  # HPバーの右に表示
+
+# 種類ごとの障害物の数の記録（F4でグラフ表示を切り替え）
+ENTITY_SAMPLE_MS = 250    # 数える間隔（ゲーム内の時間、ミリ秒）
+ENTITY_HISTORY = 240      # 残しておく回数（250ms x 240 = 1分）
+ENTITY_GRAPH_RECT = (220, 95, 460, 60)  # 処理時間グラフの下に表示
+
+# 描画設定
+USE_DIRTY_RECTS = True        # プレイ中は変わった部分だけ描き直す
+DIRTY_RECT_MAX_RATIO = 0.5    # 描き直す面積が画面のこの割合を超えたら全体を描く
+
+# 水中の光の揺らぎ（caustics.py）。強さともやの濃さはステージごとに stages.json で決める
+CAUSTICS_QUALITY = "medium"  # off / low / medium / high（高いほどなめらかで、メモリと最初の計算時間が増える）
+# 品質: (模様の解像度, 1ループのコマ数)。メモリはおよそ 幅x高さxコマ数 バイト
+CAUSTICS_QUALITIES = {
+    'low': ((200, 150), 16),     # 約0.5MB
+    'medium': ((400, 300), 32),  # 約3.8MB
+    'high': ((800, 600), 48),    # 約23MB
+}
+CAUSTICS_LOOP_MS = 4000           # 1ループの長さ（ミリ秒）
+CAUSTICS_COLOR = (110, 170, 180)  # 明るさ1のときに一番明るい筋に足す色
+FOG_COLOR = (0, 20, 60)           # 深さのもやの色
+
+# 文字描画
+TEXT_CACHE_SIZE = 128     # 描いた文字列Surfaceのキャッシュの最大件数
+
+# 障害物の使い回し
+USE_SPRITE_POOLS = True   # 消えた障害物を種類ごとのプールに返して使い回す
+POOL_CAPACITY = 256       # 種類ごとに取っておく最大数
+
+# 固定ステップ（物理は一定の間隔で進め、描画はその間を補間する）
+PHYSICS_HZ = FPS          # 1秒あたりの物理ステップ数（速さ・重力などは1ステップあたりの値）
+RENDER_FPS = 144          # 描画の上限（0なら上限なし）
+MAX_SUBSTEPS = 5          # 描画1回の間に追いつくために進める最大ステップ数
+INTERPOLATE = True        # 描画時にステップ間の位置を補間する
+
+# 入力の記録（recording.py、replay.py で再生）
+RECORD_INPUT = False      # 遊んだ入力とシードを記録する（デバッグ用。python main.py --record でも有効になる）
+RECORD_DIR = "replays"    # 記録ファイルの置き場所（このフォルダからの相対パス）
+
+# 効果音（audio.py）
+# 種類ごとに取っておくミキサーのチャンネル数（他の種類の音に使われない）
+SOUND_CHANNELS = {
+    'ui': 2,        # クリア・ゲームオーバー
+    'impact': 2,    # 当たったとき
+    'movement': 2,  # ダッシュ
+}
+# 名前: (ファイル, 種類, 同時に鳴らす最大数, 鳴らし直すまでの最短間隔ms)
+SOUND_EFFECTS = {
+    'dash': ('dash.wav', 'movement', 1, 250),
+    'hit': ('hit.wav', 'impact', 2, 100),
+    'clear': ('clear.wav', 'ui', 1, 0),
+    'gameover': ('gameover.wav', 'ui', 1, 0),
+}
@@ -0,0 +1,122 @@
+import pygame
+import random
+from settings import *
+
+# ゲームの時間・乱数・入力の出どころをまとめたモジュール
+# 通常プレイでは実時間とpygameの入力を使い、ヘッドレス実行では
+# SimClock・シード付き乱数・ScriptedInput に差し替えて同じ結果を再現できるようにする。
+
+class RealClock:
+    """実時間の時計（通常プレイ用）"""
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+
+    def tick(self, fps=0):
+        return self.clock.tick(fps)
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    def get_fps(self):
+        return self.clock.get_fps()
+
+
+class SimClock:
+    """1フレームごとに 1000/fps ミリ秒だけ進む時計（ヘッドレス実行用）
+
+    tick() は待たずにすぐ返るので、CPUの速さいっぱいでフレームを進められる。
+    """
+    def __init__(self, fps=FPS):
+        self.fps = fps
+        self.frame = 0
+
+    def tick(self, fps=0):
+        before = self.get_ticks()
+        self.frame += 1
+        return self.get_ticks() - before
+
+    def get_ticks(self):
+        return self.frame * 1000 // self.fps
+
+    def get_fps(self):
+        return float(self.fps)
+
+
+class LiveInput:
+    """キーボードとマウスからの入力（display を渡すとマウス座標を論理解像度に直す）"""
+    def __init__(self, display=None):
+        self.display = display
+
+    def update(self, frame):
+        pass
+
+    def space_pressed(self):
+        return pygame.key.get_pressed()[pygame.K_SPACE]
+
+    def mouse_pos(self):
+        pos = pygame.mouse.get_pos()
+        if self.display is not None:
+            pos = self.display.to_logical(pos)
+        return pos
+
+
+class ScriptedInput:
+    """台本どおりの入力
+
+    script は [(フレーム, スペース押下, マウス座標), ...] のキーフレームのリスト
+    （次のキーフレームまで同じ状態が続く）か、
+    関数 script(frame) -> (スペース押下, マウス座標)。
+    """
+    def __init__(self, script):
+        self.script = script if callable(script) else sorted(script, key=lambda keyframe: keyframe[0])
+        self.index = 0
+        self.space = False
+        self.mouse = (SCREEN_WIDTH // 2, 0)
+
+    def update(self, frame):
+        if callable(self.script):
+            self.space, self.mouse = self.script(frame)
+            return
+        while self.index < len(self.script) and self.script[self.index][0] <= frame:
+            _, self.space, self.mouse = self.script[self.index]
+            self.index += 1
+
+    def space_pressed(self):
+        return self.space
+
+    def mouse_pos(self):
+        return self.mouse
+
+
+clock = RealClock()
+seed = None
+streams = {}
+
+def configure(new_clock, new_seed=None):
+    """時計と乱数シードを差し替える（乱数ストリームは作り直す）"""
+    global clock, seed
+    clock = new_clock
+    seed = new_seed
+    streams.clear()
+
+def get_ticks():
+    """pygame.time.get_ticks() の代わりに使う"""
+    return clock.get_ticks()
+
+def rng(name):
+    """名前ごとの乱数ストリーム（random.Random）
+
+    シードがあれば (シード, 名前) から作るので、どこかで乱数を使う回数が
+    変わっても他のストリームの結果は変わらない。
+    """
+    stream = streams.get(name)
+    if stream is None:
+        stream = random.Random(f"{seed}:{name}") if seed is not None else random.Random()
+        streams[name] = stream
+    return stream
+
+def numpy_seed(name):
+    """NumPy乱数用のシード（シードなしなら None）"""
+    if seed is None:
+        return None
+    return rng(name).getrandbits(64)
@@ -0,0 +1,92 @@
+"""ヘッドレス・固定ステップでゲームを進めるツール
+
+SDLのダミードライバ上で SimClock・シード付き乱数・台本入力を使って実行する。
+同じシードと入力なら軌跡が完全に一致するので、--check で2回実行して確かめられる。
+
+使い方: python simulate.py [--seed N] [--frames N] [--policy dash|evasive] [--render] [--check]
+"""
+import argparse
+import hashlib
+import struct
+import time
+
+from settings import *
+from game import Game
+from sim import ScriptedInput
+
+def dash_policy(game, charge_frames=30, rest_frames=20):
+    """真上より少しずらした方向へ、ためてはダッシュを繰り返す台本"""
+    period = charge_frames + rest_frames
+    def policy(frame):
+        space = frame % period < charge_frames
+        x = SCREEN_WIDTH // 2
+        if getattr(game, 'player', None) is not None:
+            # 画面の中央に寄るように狙う
+            x = game.player.rect.centerx + (SCREEN_WIDTH // 2 - game.player.rect.centerx) // 2
+        return space, (x, 0)
+    return policy
+
+def evasive_policy(game, charge_frames=20, rest_frames=4, radius=220):
+    """上を目指しつつ、近くの障害物から離れる向きへダッシュを繰り返す台本"""
+    period = charge_frames + rest_frames
+    def policy(frame):
+        space = frame % period < charge_frames
+        player = getattr(game, 'player', None)
+        if player is None:
+            return space, (SCREEN_WIDTH // 2, 0)
+        px, py = player.rect.center
+        dx, dy = 0.0, -1.0
+        for obstacle in game.obstacles.nearby(player.rect.inflate(radius * 2, radius * 2)):
+            ox = px - obstacle.rect.centerx
+            oy = py - obstacle.rect.centery
+            distance = max(1.0, (ox * ox + oy * oy) ** 0.5)
+            if distance < radius:
+                # 近いほど強く押し返す
+                weight = (radius - distance) / radius * 2
+                dx += ox / distance * weight
+                dy += oy / distance * weight
+        return space, (int(px + dx * 100), int(py + dy * 100))
+    return policy
+
+POLICIES = {'dash': dash_policy, 'evasive': evasive_policy}
+
+def play_episode(seed, frames, render=False, policy=dash_policy):
+    """1エピソード実行して (軌跡のハッシュ, 実行フレーム数, 経過秒, Game) を返す"""
+    controls = ScriptedInput(lambda frame: (False, (0, 0)))
+    game = Game(headless=True, seed=seed, controls=controls, render=render)
+    controls.script = policy(game)
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+    steps = 0
+    while game.running and steps < frames:
+        game.run(1)
+        steps += 1
+        if game.state != "title" and hasattr(game, 'player'):
+            player = game.player
+            digest.update(struct.pack("<iddddi", game.stage, player.pos.x, player.pos.y,
+                                      player.vel.x, player.vel.y, player.hp))
+            for obstacle in game.obstacles:
+                digest.update(struct.pack("<ii", obstacle.rect.x, obstacle.rect.y))
+    elapsed = time.perf_counter() - start
+    game.loader.shutdown()
+    return digest.hexdigest(), steps, elapsed, game
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=FPS * 60)
+    parser.add_argument("--policy", default="dash", choices=list(POLICIES), help="台本")
+    parser.add_argument("--render", action="store_true", help="描画も行う（オフスクリーン）")
+    parser.add_argument("--check", action="store_true", help="2回実行して軌跡が一致するか確認する")
+    args = parser.parse_args()
+
+    policy = POLICIES[args.policy]
+    digest, steps, elapsed, game = play_episode(args.seed, args.frames, args.render, policy)
+    print(f"seed={args.seed} frames={steps} stage={game.stage} result={game.result} "
+          f"{steps / elapsed:.0f} frames/s digest={digest[:16]}")
+    if args.check:
+        again, _, _, _ = play_episode(args.seed, args.frames, args.render, policy)
+        print("deterministic" if again == digest else f"MISMATCH digest={again[:16]}")
+
+if __name__ == "__main__":
+    main()
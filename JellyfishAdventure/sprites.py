@@ -1,38 +1,20 @@
 import pygame
 import math
 from settings import *
-import random
-import os
-
-def make_transparent(surface, threshold=230):
-    """白っぽい背景を透明にする（しきい値以上のRGB値を透明化）"""
-    surface = surface.copy()
-    width, height = surface.get_size()
-    for x in range(width):
-        for y in range(height):
-            r, g, b, a = surface.get_at((x, y))
-            # 白っぽい（R,G,B全てがしきい値以上）なら透明に
-            if r >= threshold and g >= threshold and b >= threshold:
-                surface.set_at((x, y), (r, g, b, 0))
-    return surface
+from atlas import sprite_atlas, set_alpha
+import sim
 
 class Jellyfish(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, controls=None):
         super().__init__()
-        # 画像ディレクトリの取得
-        self.assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-        
-        # 画像の読み込み（通常時とダメージ時）
-        self.image_normal = pygame.image.load(os.path.join(self.assets_dir, "jellyfish_normal.png")).convert_alpha()
-        self.image_normal = pygame.transform.scale(self.image_normal, (60, 60))
-        self.image_normal = make_transparent(self.image_normal)
-        
-        self.image_hit = pygame.image.load(os.path.join(self.assets_dir, "jellyfish_hit.png")).convert_alpha()
-        self.image_hit = pygame.transform.scale(self.image_hit, (60, 60))
-        self.image_hit = make_transparent(self.image_hit)
+        # 入力元（通常はキーボード・マウス。ヘッドレス実行では台本）
+        self.controls = controls if controls is not None else sim.LiveInput()
 
-        # マスクの作成（より正確な当たり判定のため）
-        self.mask = pygame.mask.from_surface(self.image_normal)
+        # 画像の読み込み（通常時とダメージ時）
+        # 共有アトラスから取得。アルファ値は update() で毎フレーム設定し直す
+        # マスクも一緒に作成済み（より正確な当たり判定のため）
+        self.image_normal, self.mask = sprite_atlas.get("jellyfish_normal.png", (60, 60))
+        self.image_hit, _ = sprite_atlas.get("jellyfish_hit.png", (60, 60))
 
         self.image = self.image_normal
         self.rect = self.image.get_rect(center=pos)
@@ -58,28 +40,27 @@ class Jellyfish(pygame.sprite.Sprite):
         self.invincible_duration = 1000 # 1秒
 
     def input(self):
-        keys = pygame.key.get_pressed()
         self.acc = pygame.math.Vector2(0, self.gravity) # 常に重力がかかる
 
-        if keys[pygame.K_SPACE]:
+        if self.controls.space_pressed():
             if not self.is_charging:
                 self.is_charging = True
-                self.charge_start_time = pygame.time.get_ticks()
+                self.charge_start_time = sim.get_ticks()
             
             # チャージ中は落下のみ（移動入力無効）
             # 視覚効果：色が濃くなる
-            color_val = max(0, 255 - (pygame.time.get_ticks() - self.charge_start_time) // 5)
-            self.image.set_alpha(max(100, color_val)) # 少しずつ暗くなる
+            color_val = max(0, 255 - (sim.get_ticks() - self.charge_start_time) // 5)
+            set_alpha(self.image, max(100, color_val)) # 少しずつ暗くなる
 
         else:
             # ダッシュ発動判定
             if self.is_charging:
-                charge_duration = pygame.time.get_ticks() - self.charge_start_time
+                charge_duration = sim.get_ticks() - self.charge_start_time
                 # 最低300ms以上チャージしないとダッシュしない
                 if charge_duration >= 300:
                     self.dash(charge_duration)
                 self.is_charging = False
-                self.image.set_alpha(255) # 元に戻す
+                set_alpha(self.image, 255) # 元に戻す
             
             # 矢印キーでの移動は無効化（ダッシュのみで移動）
 
@@ -90,7 +71,7 @@ class Jellyfish(pygame.sprite.Sprite):
         if power < 3: power = 3 # 最低保証
 
         # マウスカーソルの位置を取得
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.controls.mouse_pos()
         # プレイヤーからマウスへの方向ベクトルを計算
         direction = pygame.math.Vector2(mouse_pos[0] - self.rect.centerx, 
                                          mouse_pos[1] - self.rect.centery)
@@ -108,7 +89,7 @@ class Jellyfish(pygame.sprite.Sprite):
 
         # 無敵時間の処理
         if self.invincible:
-            now = pygame.time.get_ticks()
+            now = sim.get_ticks()
             if now - self.invincible_timer > self.invincible_duration:
                 self.invincible = False
                 self.image = self.image_normal
@@ -116,12 +97,12 @@ class Jellyfish(pygame.sprite.Sprite):
                 # 無敵中はダメージ画像にし、かつ点滅させる（仮の実装：アルファ値をいじるか描画を飛ばす）
                 self.image = self.image_hit
                 if (now // 100) % 2 == 0:
-                    self.image.set_alpha(100)
+                    set_alpha(self.image, 100)
                 else:
-                    self.image.set_alpha(255)
+                    set_alpha(self.image, 255)
         else:
             self.image = self.image_normal
-            self.image.set_alpha(255)
+            set_alpha(self.image, 255)
 
         # 物理挙動更新
         self.vel += self.acc
@@ -147,14 +128,15 @@ class Jellyfish(pygame.sprite.Sprite):
 
 
 class Obstacle(pygame.sprite.Sprite):
+    pool = None     # 返却先の SpritePool（プールで作ったときだけ）
+    pooled = False  # プールに返してある
+    expires_at = None  # 寿命で消える時刻（EntityLifecycle が入れる）
+
     def __init__(self, pos, size=(30, 30), color=RED, image_name=None):
         super().__init__()
-        self.assets_dir = os.path.join(os.path.dirname(__file__), "assets")
         if image_name:
-            self.image_raw = pygame.image.load(os.path.join(self.assets_dir, image_name)).convert_alpha()
-            self.image = pygame.transform.scale(self.image_raw, size)
-            self.image = make_transparent(self.image)
-            self.mask = pygame.mask.from_surface(self.image)
+            # 同じ画像・サイズの障害物は画像とマスクを共有する
+            self.image, self.mask = sprite_atlas.get(image_name, size)
         else:
             self.image = pygame.Surface(size)
             self.image.fill(color)
@@ -163,6 +145,31 @@ class Obstacle(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(topleft=pos)
         self.pos = pygame.math.Vector2(pos)
 
+    def reset(self, pos):
+        """プールから使い回すときに、作った直後と同じ状態に戻す"""
+        self.rect.topleft = pos
+        self.pos.update(pos)
+
+    def kill(self):
+        super().kill()
+        self.release()
+
+    def remove_internal(self, group):
+        # Group.empty() などで最後のグループから外れたときもプールに返す
+        super().remove_internal(group)
+        if not self.alive():
+            self.release()
+
+    def release(self):
+        if self.pool is not None:
+            self.pool.release(self)
+
+    def offscreen(self):
+        """画面の外に OFFSCREEN_MARGIN より離れていれば True"""
+        rect = self.rect
+        return (rect.right < -OFFSCREEN_MARGIN or rect.left > SCREEN_WIDTH + OFFSCREEN_MARGIN
+                or rect.bottom < -OFFSCREEN_MARGIN or rect.top > SCREEN_HEIGHT + OFFSCREEN_MARGIN)
+
     def update(self):
         # 基本は何もしない
         pass
@@ -175,9 +182,13 @@ class Seaweed(Obstacle):
         self.sway_speed = 0.005
         self.sway_amount = 20
 
+    def reset(self, pos):
+        super().reset(pos)
+        self.start_x = pos[0]
+
     def update(self):
         # サイン波で左右に揺れる
-        offset = math.sin(pygame.time.get_ticks() * self.sway_speed) * self.sway_amount
+        offset = math.sin(sim.get_ticks() * self.sway_speed) * self.sway_amount
         self.rect.x = self.start_x + offset
 
 class Sunfish(Obstacle):
@@ -185,23 +196,28 @@ class Sunfish(Obstacle):
         super().__init__(pos, size=(70, 70), color=RED, image_name="sunfish.png")
         self.speed = 1.5
         self.player = player  # プレイヤーへの参照
+        self.direction = pygame.math.Vector2()  # 毎フレーム使い回す
+
+    def reset(self, pos, player=None):
+        super().reset(pos)
+        self.player = player
 
     def update(self):
         if self.player:
             # プレイヤーに向かって移動
-            direction = pygame.math.Vector2(
+            direction = self.direction
+            direction.update(
                 self.player.rect.centerx - self.rect.centerx,
                 self.player.rect.centery - self.rect.centery
             )
             if direction.length() > 0:
-                direction = direction.normalize()
-            self.pos += direction * self.speed
+                direction.normalize_ip()
+            direction *= self.speed
+            self.pos += direction
             self.rect.topleft = self.pos
         
         # 画面外に出たら消える
-        if self.rect.right < -50 or self.rect.left > SCREEN_WIDTH + 50:
-            self.kill()
-        if self.rect.bottom < -50 or self.rect.top > SCREEN_HEIGHT + 50:
+        if self.offscreen():
             self.kill()
 
 class Turtle(Obstacle):
@@ -211,8 +227,12 @@ class Turtle(Obstacle):
         self.speed = 0.5  # 修正: 1 -> 0.5
         self.vel = pygame.math.Vector2(self.speed, 0)
         # ランダムな方向に動く
-        import random
-        self.vel.rotate_ip(random.randint(0, 360))
+        self.vel.rotate_ip(sim.rng('sprites').randint(0, 360))
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.vel.update(self.speed, 0)
+        self.vel.rotate_ip(sim.rng('sprites').randint(0, 360))
 
     def update(self):
         self.pos += self.vel
@@ -233,39 +253,5 @@ class PlasticWaste(Obstacle):
     def update(self):
         self.rect.y += self.fall_speed
         self.rect.x += self.drift_speed  # 横に流れる
-        if self.rect.top > SCREEN_HEIGHT or self.rect.left > SCREEN_WIDTH:
-            self.kill()
-
-
-class Bubble(pygame.sprite.Sprite):
-    def __init__(self, pos, speed_y=2, size=None):
-        super().__init__()
-        if size:
-            self.radius = size
-        else:
-            self.radius = random.randint(2, 6)
-            
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-        # 半透明の白い円
-        pygame.draw.circle(self.image, (255, 255, 255, 150), (self.radius, self.radius), self.radius)
-        self.rect = self.image.get_rect(center=pos)
-        
-        self.pos = pygame.math.Vector2(pos)
-        self.vel = pygame.math.Vector2(random.uniform(-0.5, 0.5), -speed_y)
-        self.timer = 0
-        self.life_time = random.randint(60, 120) # フレーム数
-
-    def update(self):
-        self.pos += self.vel
-        self.pos.x += math.sin(self.timer * 0.1) * 0.5 # ゆらゆら
-        self.rect.center = self.pos
-        
-        self.timer += 1
-        if self.timer > self.life_time:
+        if self.offscreen():
             self.kill()
-        
-        # 画面外に出たら消える
-        if self.rect.bottom < 0:
-            self.kill()
-
-
@@ -0,0 +1,335 @@
+import heapq
+import json
+import os
+from bisect import bisect_right
+from settings import *
+
+# ステージ定義（stages.json）の読み込み・検査と、出現予定のタイムライン
+#
+# stages.json の形:
+#   "regions": {名前: 出現範囲}     … 表から名前で参照できる（その場に書いてもよい）
+#   "tables":  {名前: 出現表}
+#   "stages":  [ステージ1, ステージ2, ...]
+# ステージ:
+#   "background": 背景画像（assets/ のファイル名）
+#   "caustics": 背景に重ねる光の揺らぎの明るさ 0〜1（省略時0、caustics.py）
+#   "fog": [上のアルファ, 下のアルファ] 0〜255 の深さのもや（省略時なし）
+#   "max_obstacles": 画面にこれだけ障害物がいる間は出さない（省略時 OBSTACLE_BUDGET、null なら上限なし）
+#   "initial": {"placed": [{"type", "pos": [x, y]}, ...]}   … 決まった位置に置く
+#            | {"count": n | [最小, 最大], "table": 出現表}  … 表から選んで置く
+#   "spawners": [{"interval": ミリ秒, "table": 出現表}, ...]
+#               interval は必須（実際の間隔はこれに SPAWN_INTERVAL_SCALE を掛けたもの）
+# 出現表: [{"type": 障害物, "weight": 整数の重み（省略時1）, "region": 出現範囲}, ...]
+# 出現範囲: {"x": x, "y": y}                … 数値ならその位置、[最小, 最大] なら乱数（両端を含む）
+#         | {"y": y, "sides": [x, ...]}     … y を決めてから、並べた x のどれかにする（画面の端から出る）
+# 座標は論理解像度（SCREEN_WIDTH x SCREEN_HEIGHT）のピクセル。
+
+STAGES_PATH = os.path.join(os.path.dirname(__file__), STAGES_FILE)
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+OBSTACLE_TYPES = ('seaweed', 'sunfish', 'turtle', 'waste')
+MAX_STAGES = 255  # 入力記録ファイルにステージ番号を1バイトで書くため
+
+def pick(value, rng):
+    """数値ならそのまま、[最小, 最大] なら rng.randint"""
+    if isinstance(value, list):
+        return rng.randint(value[0], value[1])
+    return value
+
+
+class StageError(ValueError):
+    """ステージ定義の誤り。errors に見つかったものを全部入れる"""
+    def __init__(self, path, errors):
+        super().__init__(f"{path}: " + "; ".join(errors))
+        self.path = path
+        self.errors = errors
+
+
+class Region:
+    """出現範囲。sample() で位置を1つ決める"""
+    def __init__(self, spec):
+        self.x = spec.get('x')
+        self.y = spec['y']
+        self.sides = spec.get('sides')
+
+    def sample(self, rng):
+        if self.sides is not None:
+            y = pick(self.y, rng)
+            return (self.sides[int(rng.random() * len(self.sides))], y)
+        x = pick(self.x, rng)
+        return (x, pick(self.y, rng))
+
+
+class SpawnTable:
+    """重み付きの出現表。roll() で (障害物の種類, 位置) を決める
+
+    重みの合計未満の整数を1つ引いて選ぶので、重みが全部1なら
+    rng.choice(種類のリスト) と同じ乱数の使い方になる。
+    """
+    def __init__(self, entries):
+        self.types = []
+        self.regions = []
+        self.cumulative = []  # 重みの累積（bisect で選ぶ）
+        self.total = 0
+        for entry in entries:
+            self.types.append(entry['type'])
+            self.regions.append(entry['region'])
+            self.total += entry.get('weight', 1)
+            self.cumulative.append(self.total)
+
+    def roll(self, rng):
+        index = bisect_right(self.cumulative, rng.randrange(self.total))
+        return self.types[index], self.regions[index].sample(rng)
+
+
+class Stage:
+    """1ステージ分の定義（stages.json の1要素を参照を解いたもの）"""
+    def __init__(self, number, spec):
+        self.number = number
+        self.background = spec['background']
+        self.caustics = spec.get('caustics', 0)
+        self.fog = tuple(spec['fog']) if spec.get('fog') else None
+        self.max_obstacles = spec.get('max_obstacles', OBSTACLE_BUDGET)
+        initial = spec.get('initial', {})
+        self.placed = [(entry['type'], tuple(entry['pos'])) for entry in initial.get('placed', [])]
+        self.initial_count = initial.get('count', 0)
+        self.initial_table = initial.get('table')
+        self.spawners = [(spawner['interval'], spawner['table']) for spawner in spec.get('spawners', [])]
+
+    def initial_obstacles(self, rng):
+        """ステージ開始時に置く [(種類, 位置), ...]"""
+        if self.initial_table is None:
+            return list(self.placed)
+        return self.placed + [self.initial_table.roll(rng) for _ in range(pick(self.initial_count, rng))]
+
+    def timeline(self, start):
+        """start（ミリ秒）から始まる出現予定を作る"""
+        spawners = [(interval * SPAWN_INTERVAL_SCALE, table) for interval, table in self.spawners]
+        return SpawnTimeline(spawners, start, self.max_obstacles)
+
+
+class SpawnTimeline:
+    """ステージ中の出現予定を、時刻順のヒープ (時刻, 出現表の番号) で持つ
+
+    毎ステップ見るのはヒープの先頭（一番早い予定）だけで、出現1回ごとに
+    次の予定を積み直す（O(log n)）。予定の時刻を過ぎた最初のステップで出し、
+    次はそのステップの時刻から interval 後。上限に達している間は予定を残したまま待つ。
+    """
+    def __init__(self, spawners, start, cap=None):
+        self.spawners = spawners  # [(interval, SpawnTable), ...]
+        self.cap = cap
+        self.heap = [(start + interval, index) for index, (interval, _) in enumerate(spawners)]
+        heapq.heapify(self.heap)
+
+    def due(self, now, count):
+        """now までに予定の来た出現表を1つ返す（無い・count が上限なら None）"""
+        if not self.heap or self.heap[0][0] >= now:
+            return None
+        if self.cap is not None and count >= self.cap:
+            return None
+        index = self.heap[0][1]
+        interval, table = self.spawners[index]
+        heapq.heapreplace(self.heap, (now + interval, index))
+        return table
+
+    def stop(self):
+        """これ以上出さない"""
+        self.heap.clear()
+
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def check_range(value, where, errors):
+    """数値か [最小, 最大] の整数の組か"""
+    if isinstance(value, list):
+        if len(value) != 2 or not all(is_int(v) for v in value):
+            errors.append(f"{where}: [最小, 最大] は整数2つ")
+        elif value[0] > value[1]:
+            errors.append(f"{where}: 最小 {value[0]} が最大 {value[1]} より大きい")
+    elif not is_int(value):
+        errors.append(f"{where}: 整数か [最小, 最大] にする")
+
+def check_region(spec, where, errors):
+    if not isinstance(spec, dict):
+        errors.append(f"{where}: 出現範囲はオブジェクト")
+        return
+    unknown = set(spec) - {'x', 'y', 'sides'}
+    if unknown:
+        errors.append(f"{where}: 知らないキー {sorted(unknown)}")
+    if 'y' not in spec:
+        errors.append(f"{where}: y が無い")
+    else:
+        check_range(spec['y'], f"{where}.y", errors)
+    if 'sides' in spec:
+        if 'x' in spec:
+            errors.append(f"{where}: x と sides は同時に使えない")
+        sides = spec['sides']
+        if not isinstance(sides, list) or not sides or not all(is_int(x) for x in sides):
+            errors.append(f"{where}.sides: 整数のリストにする")
+    elif 'x' not in spec:
+        errors.append(f"{where}: x か sides が要る")
+    else:
+        check_range(spec['x'], f"{where}.x", errors)
+
+def check_table(entries, where, regions, errors):
+    if not isinstance(entries, list) or not entries:
+        errors.append(f"{where}: 出現表は空でないリスト")
+        return
+    for i, entry in enumerate(entries):
+        at = f"{where}[{i}]"
+        if not isinstance(entry, dict):
+            errors.append(f"{at}: オブジェクトにする")
+            continue
+        if entry.get('type') not in OBSTACLE_TYPES:
+            errors.append(f"{at}.type: {entry.get('type')!r} は {', '.join(OBSTACLE_TYPES)} のどれか")
+        weight = entry.get('weight', 1)
+        if not is_int(weight) or weight <= 0:
+            errors.append(f"{at}.weight: 正の整数にする")
+        region = entry.get('region')
+        if isinstance(region, str):
+            if region not in regions:
+                errors.append(f"{at}.region: {region!r} は regions に無い")
+        else:
+            check_region(region, f"{at}.region", errors)
+
+def check_table_ref(ref, where, tables, regions, errors):
+    if isinstance(ref, str):
+        if ref not in tables:
+            errors.append(f"{where}: {ref!r} は tables に無い")
+    else:
+        check_table(ref, where, regions, errors)
+
+def check_stage(spec, where, tables, regions, assets_dir, errors):
+    if not isinstance(spec, dict):
+        errors.append(f"{where}: オブジェクトにする")
+        return
+    unknown = set(spec) - {'background', 'caustics', 'fog', 'max_obstacles', 'initial', 'spawners'}
+    if unknown:
+        errors.append(f"{where}: 知らないキー {sorted(unknown)}")
+
+    background = spec.get('background')
+    if not isinstance(background, str):
+        errors.append(f"{where}.background: ファイル名が要る")
+    elif assets_dir is not None and not os.path.exists(os.path.join(assets_dir, background)):
+        errors.append(f"{where}.background: {background} が {assets_dir} に無い")
+
+    caustics = spec.get('caustics', 0)
+    if isinstance(caustics, bool) or not isinstance(caustics, (int, float)) or not 0 <= caustics <= 1:
+        errors.append(f"{where}.caustics: 0〜1 の数にする")
+    fog = spec.get('fog')
+    if fog is not None and (not isinstance(fog, list) or len(fog) != 2
+                            or not all(is_int(v) and 0 <= v <= 255 for v in fog)):
+        errors.append(f"{where}.fog: [上, 下] の 0〜255 の整数にする")
+
+    cap = spec.get('max_obstacles')
+    if cap is not None and (not is_int(cap) or cap <= 0):
+        errors.append(f"{where}.max_obstacles: 正の整数か null にする")
+
+    initial = spec.get('initial', {})
+    if not isinstance(initial, dict):
+        errors.append(f"{where}.initial: オブジェクトにする")
+    else:
+        for i, entry in enumerate(initial.get('placed', [])):
+            at = f"{where}.initial.placed[{i}]"
+            if not isinstance(entry, dict):
+                errors.append(f"{at}: オブジェクトにする")
+                continue
+            if entry.get('type') not in OBSTACLE_TYPES:
+                errors.append(f"{at}.type: {entry.get('type')!r} は {', '.join(OBSTACLE_TYPES)} のどれか")
+            pos = entry.get('pos')
+            if not isinstance(pos, list) or len(pos) != 2 or not all(is_int(v) for v in pos):
+                errors.append(f"{at}.pos: [x, y] の整数にする")
+        if 'count' in initial or 'table' in initial:
+            if 'table' not in initial:
+                errors.append(f"{where}.initial: count には table が要る")
+            else:
+                check_table_ref(initial['table'], f"{where}.initial.table", tables, regions, errors)
+            check_range(initial.get('count', 0), f"{where}.initial.count", errors)
+
+    spawners = spec.get('spawners', [])
+    if not isinstance(spawners, list):
+        errors.append(f"{where}.spawners: リストにする")
+        return
+    for i, spawner in enumerate(spawners):
+        at = f"{where}.spawners[{i}]"
+        if not isinstance(spawner, dict):
+            errors.append(f"{at}: オブジェクトにする")
+            continue
+        interval = spawner.get('interval')
+        if interval is None:
+            errors.append(f"{at}: interval が要る")
+        elif isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            errors.append(f"{at}.interval: 正の数（ミリ秒）にする")
+        if 'table' not in spawner:
+            errors.append(f"{at}: table が要る")
+        else:
+            check_table_ref(spawner['table'], f"{at}.table", tables, regions, errors)
+
+def validate_stages(data, assets_dir=ASSETS_DIR):
+    """ステージ定義の誤りを全部探してリストで返す（空なら正しい）
+
+    assets_dir=None なら背景画像の有無は調べない。
+    """
+    errors = []
+    if not isinstance(data, dict):
+        return ["最上位はオブジェクトにする"]
+    regions = data.get('regions', {})
+    tables = data.get('tables', {})
+    if not isinstance(regions, dict):
+        errors.append("regions: オブジェクトにする")
+        regions = {}
+    if not isinstance(tables, dict):
+        errors.append("tables: オブジェクトにする")
+        tables = {}
+    for name, spec in regions.items():
+        check_region(spec, f"regions.{name}", errors)
+    for name, entries in tables.items():
+        check_table(entries, f"tables.{name}", regions, errors)
+
+    stages = data.get('stages')
+    if not isinstance(stages, list) or not stages:
+        errors.append("stages: 1つ以上のステージのリストにする")
+        return errors
+    if len(stages) > MAX_STAGES:
+        errors.append(f"stages: {MAX_STAGES} ステージまで")
+    for i, spec in enumerate(stages):
+        check_stage(spec, f"stages[{i}]", tables, regions, assets_dir, errors)
+    return errors
+
+def compile_stages(data):
+    """検査済みの定義から Stage のリストを作る（名前の参照を Region・SpawnTable にする）"""
+    regions = {name: Region(spec) for name, spec in data.get('regions', {}).items()}
+
+    def region(ref):
+        return regions[ref] if isinstance(ref, str) else Region(ref)
+
+    def table(entries):
+        return SpawnTable([dict(entry, region=region(entry['region'])) for entry in entries])
+
+    tables = {name: table(entries) for name, entries in data.get('tables', {}).items()}
+
+    def table_ref(ref):
+        return tables[ref] if isinstance(ref, str) else table(ref)
+
+    stages = []
+    for number, spec in enumerate(data['stages'], 1):
+        spec = dict(spec)
+        initial = dict(spec.get('initial', {}))
+        if 'table' in initial:
+            initial['table'] = table_ref(initial['table'])
+        spec['initial'] = initial
+        spec['spawners'] = [dict(spawner, table=table_ref(spawner['table'])) for spawner in spec.get('spawners', [])]
+        stages.append(Stage(number, spec))
+    return stages
+
+def load_stages(path=STAGES_PATH):
+    """stages.json を読んで検査し、Stage のリストを返す（誤りがあれば StageError）"""
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise StageError(path, [f"JSONとして読めない: {e}"])
+    errors = validate_stages(data)
+    if errors:
+        raise StageError(path, errors)
+    return compile_stages(data)
@@ -0,0 +1,161 @@
+import logging
+import pygame
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from settings import *
+
+log = logging.getLogger(__name__)
+
+def surface_bytes(surface):
+    """Surface の画素データの大きさ（バイト）"""
+    return surface.get_pitch() * surface.get_height()
+
+
+class AssetStreamer:
+    """ステージごとの大きな画像を、使う分だけ読み込んで持っておく
+
+    register() で読み込み方だけ登録しておき（まだ読まない）、prefetch() で
+    AssetLoader のスレッドに読み込ませる。keep() で今と次に使う画像を指定すると、
+    読み込み済みの画像の合計が budget バイトを超えた分を、keep() されていない
+    ものから使ったのが古い順に手放す。手放した画像は、次に要るときに読み直す。
+    メインスレッドから使う（読み込みだけがスレッドで動く）。
+    """
+    def __init__(self, loader, budget=ASSET_MEMORY_BUDGET):
+        self.loader = loader
+        self.budget = budget
+        self.sources = {}              # キー -> (関数, 引数, キーワード引数)
+        self.resident = OrderedDict()  # キー -> Surface（使ったのが古い順）
+        self.pending = {}              # キー -> LazyAsset（読み込み中）
+        self.kept = set()
+        self.loads = 0       # 読み込んだ回数（読み直しを含む）
+        self.waits = 0       # 読み込みが間に合わずメインスレッドで待った回数
+        self.evictions = 0   # 予算を超えて手放した回数
+        self.failures = {}   # キー -> 裏での読み込みに失敗したときの例外
+
+    def register(self, key, func, *args, **kwargs):
+        self.sources[key] = (func, args, kwargs)
+
+    def __contains__(self, key):
+        return key in self.sources
+
+    def prefetch(self, key):
+        """まだ無ければ裏で読み込み始める"""
+        if key in self.sources and key not in self.resident and key not in self.pending:
+            func, args, kwargs = self.sources[key]
+            try:
+                self.pending[key] = self.loader.submit(func, *args, **kwargs)
+            except RuntimeError:
+                # AssetLoader を止めた後は、要るときにその場で読み込む
+                pass
+
+    def ready(self, key):
+        """待たずに使えるなら True（無ければ読み込みを始めて False）"""
+        if key in self.resident:
+            return True
+        self.prefetch(key)
+        pending = self.pending.get(key)
+        return pending is None or pending.ready()
+
+    def __getitem__(self, key):
+        surface = self.resident.get(key)
+        if surface is not None:
+            self.resident.move_to_end(key)
+            return surface
+
+        func, args, kwargs = self.sources[key]
+        pending = self.pending.pop(key, None)
+        if pending is None or not pending.ready():
+            self.waits += 1
+        try:
+            surface = pending.get() if pending is not None else func(*args, **kwargs)
+        except CancelledError:
+            # AssetLoader を止めて読み込みが取り消されたときは、その場で読み込む
+            surface = func(*args, **kwargs)
+        self.store(key, surface)
+        self.trim()
+        return surface
+
+    def get(self, key, default=None):
+        if key in self.sources:
+            return self[key]
+        return default
+
+    def store(self, key, surface):
+        self.loads += 1
+        self.failures.pop(key, None)
+        if surface is not None:
+            self.resident[key] = surface
+
+    def poll(self):
+        """読み終わったものを受け取り、予算を超えていれば手放す（毎フレーム呼ぶ）"""
+        if not self.pending:
+            return
+        for key in [key for key, pending in self.pending.items() if pending.ready()]:
+            try:
+                surface = self.pending.pop(key).get()
+            except CancelledError:
+                continue
+            except (OSError, pygame.error) as e:
+                # 持たずにおく（次に要るときに読み直し、また失敗すればそこで例外になる）
+                self.failures[key] = e
+                log.warning("Failed to load %s: %s", key, e)
+                continue
+            self.store(key, surface)
+        self.trim()
+
+    def keep(self, keys):
+        """今と次に使う画像を指定して、裏で読み込み始める"""
+        self.kept = set(keys)
+        for key in self.kept:
+            self.prefetch(key)
+        self.trim()
+
+    def trim(self):
+        total = self.resident_bytes()
+        for key in list(self.resident):
+            if total <= self.budget:
+                break
+            if key in self.kept:
+                continue
+            total -= surface_bytes(self.resident.pop(key))
+            self.evictions += 1
+
+    def resident_bytes(self):
+        """持っている画像の画素データの合計（バイト）"""
+        return sum(surface_bytes(surface) for surface in self.resident.values())
+
+    def view(self, group):
+        """キーが (group, 名前) の画像を、名前だけで引けるようにしたもの"""
+        return AssetView(self, group)
+
+    def stats(self):
+        return {
+            'budget': self.budget,
+            'resident_bytes': self.resident_bytes(),
+            'resident': len(self.resident),
+            'pending': len(self.pending),
+            'registered': len(self.sources),
+            'loads': self.loads,
+            'waits': self.waits,
+            'evictions': self.evictions,
+            'failures': {str(key): str(error) for key, error in self.failures.items()},
+        }
+
+
+class AssetView:
+    """AssetStreamer の1グループ分を辞書のように引く（bg_images[stage] など）"""
+    def __init__(self, streamer, group):
+        self.streamer = streamer
+        self.group = group
+
+    def __getitem__(self, name):
+        return self.streamer[(self.group, name)]
+
+    def __contains__(self, name):
+        return (self.group, name) in self.streamer
+
+    def get(self, name, default=None):
+        return self.streamer.get((self.group, name), default)
+
+    def ready(self, name):
+        return self.streamer.ready((self.group, name))
@@ -0,0 +1,244 @@
+"""物理・出現の定数を格子状に変えてヘッドレスで遊ばせる調整用ツール
+
+--param で変える定数と値を並べると、その全組み合わせ × シードごとに1エピソードずつ、
+台本のダッシュ（simulate.POLICIES、既定は障害物を避ける evasive）でステージ1から遊ばせる。
+エピソードはプロセスプールで全コアに振り分け、終わった順に1行1件のJSONで書き出す。
+最後に組み合わせ・ステージごとのクリア率、クリアまでの時間、
+ゲームオーバーの原因（Game.update が death_cause に入れる分類）を集計して表示する。
+
+使い方:
+    python sweep.py --param GRAVITY=0.08,0.1,0.12 --param DASH_POWER_MAX=8,10 \\
+                    [--episodes 20] [--frames N] [--policy evasive|dash] [--workers N]
+                    [--out sweep.jsonl] [--resume] [--summary summary.json]
+    python sweep.py --aggregate sweep.jsonl
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+from settings import *
+
+# 変えられる定数（出現間隔は stages.json の interval に掛ける倍率で変える）
+TUNABLE = [
+    'GRAVITY',
+    'JELLY_SPEED',
+    'DASH_POWER_MAX',
+    'FRICTION',
+    'SPAWN_INTERVAL_SCALE',
+]
+DEATH_CAUSES = ['seaweed', 'sunfish', 'turtle', 'waste', None]
+
+def parse_param(text):
+    """"NAME=1,2,3" -> ("NAME", [1, 2, 3])"""
+    name, _, values = text.partition("=")
+    name = name.strip().upper()
+    if name not in TUNABLE:
+        raise argparse.ArgumentTypeError(f"{name} は変えられません（{', '.join(TUNABLE)}）")
+    parsed = []
+    for value in values.split(","):
+        value = value.strip()
+        try:
+            parsed.append(int(value))
+        except ValueError:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"{name} の値が数値ではありません: {value}")
+    return name, parsed
+
+# 書き換える前の定数 {(モジュール, 名前): 値}（ワーカーは複数のエピソードで使い回されるので毎回戻す）
+ORIGINALS = {}
+
+def param_modules():
+    """定数を from settings import * で取り込んでいるモジュール"""
+    import settings
+    import game
+    import sprites
+    import stages
+    return (settings, game, sprites, stages)
+
+def snapshot_params():
+    """TUNABLE の元の値を覚えておく（最初の1回だけ）"""
+    if ORIGINALS:
+        return
+    for module in param_modules():
+        for name in TUNABLE:
+            if hasattr(module, name):
+                ORIGINALS[(module, name)] = getattr(module, name)
+
+def apply_params(params):
+    """定数を元に戻してから params の分を書き換える（from settings import * で取り込んだ各モジュールの分も）"""
+    snapshot_params()
+    for (module, name), value in ORIGINALS.items():
+        setattr(module, name, params.get(name, value))
+
+def init_worker():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    snapshot_params()
+
+def run_episode(task):
+    """1エピソード遊ばせて、ステージごとの結果を返す（ワーカープロセスで実行）"""
+    params, seed, max_frames, policy = task
+    apply_params(params)
+    from game import Game
+    from sim import ScriptedInput
+    from simulate import POLICIES
+
+    controls = ScriptedInput(lambda frame: (False, (0, 0)))
+    game = Game(headless=True, seed=seed, controls=controls, render=False)
+    controls.script = POLICIES[policy](game)
+    stages = []
+    stage = None
+    stage_start = 0
+    while game.running and game.frame < max_frames:
+        game.run(1)
+        if game.state == "playing" and game.stage != stage:
+            if stage is not None:
+                stages.append({'stage': stage, 'result': 'clear', 'frames': game.frame - stage_start})
+            stage, stage_start = game.stage, game.frame
+
+    if game.result == 'clear':
+        stages.append({'stage': stage, 'result': 'clear', 'frames': game.frame - stage_start})
+    elif game.result == 'game_over':
+        stages.append({'stage': stage, 'result': 'game_over', 'frames': game.frame - stage_start,
+                       'death_cause': game.death_cause})
+    else:
+        stages.append({'stage': stage, 'result': 'timeout', 'frames': game.frame - stage_start})
+    game.loader.shutdown()
+    return {
+        'params': params,
+        'seed': seed,
+        'policy': policy,
+        'result': game.result or 'timeout',
+        'frames': game.frame,
+        'stages': stages,
+    }
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+def load_results(path):
+    results = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                results.append(json.loads(line))
+    return results
+
+def aggregate(results):
+    """組み合わせごと・ステージごとに集計する"""
+    summary = {}
+    groups = defaultdict(list)
+    for episode in results:
+        # 台本が違う結果は混ぜない
+        groups[(episode.get('policy'), params_key(episode['params']))].append(episode)
+
+    for key, episodes in groups.items():
+        per_stage = defaultdict(lambda: {'attempts': 0, 'clears': 0, 'clear_frames': [],
+                                         'deaths': Counter(), 'timeouts': 0})
+        for episode in episodes:
+            for record in episode['stages']:
+                stats = per_stage[record['stage']]
+                stats['attempts'] += 1
+                if record['result'] == 'clear':
+                    stats['clears'] += 1
+                    stats['clear_frames'].append(record['frames'])
+                elif record['result'] == 'game_over':
+                    stats['deaths'][str(record.get('death_cause'))] += 1
+                else:
+                    stats['timeouts'] += 1
+
+        stages = {}
+        for stage in sorted(per_stage):
+            stats = per_stage[stage]
+            seconds = [frames / FPS for frames in stats['clear_frames']]
+            stages[stage] = {
+                'attempts': stats['attempts'],
+                'clears': stats['clears'],
+                'clear_rate': stats['clears'] / stats['attempts'],
+                'time_to_clear_mean_s': statistics.fmean(seconds) if seconds else None,
+                'time_to_clear_median_s': statistics.median(seconds) if seconds else None,
+                'deaths': dict(stats['deaths']),
+                'timeouts': stats['timeouts'],
+            }
+        summary[key] = {
+            'policy': episodes[0].get('policy'),
+            'params': episodes[0]['params'],
+            'episodes': len(episodes),
+            'clear_rate': sum(episode['result'] == 'clear' for episode in episodes) / len(episodes),
+            'stages': stages,
+        }
+    return summary
+
+def print_summary(summary):
+    causes = [str(cause) for cause in DEATH_CAUSES]
+    for entry in summary.values():
+        params = ", ".join(f"{name}={value}" for name, value in sorted(entry['params'].items())) or "(default)"
+        print(f"{params}  policy={entry['policy']}  episodes={entry['episodes']}  full clear {entry['clear_rate'] * 100:.0f}%")
+        print(f"  {'stage':>5} {'tries':>5} {'clear%':>6} {'mean s':>7} {'med s':>7}  " +
+              " ".join(f"{cause:>7}" for cause in causes) + f" {'timeout':>7}")
+        for stage, stats in entry['stages'].items():
+            mean = stats['time_to_clear_mean_s']
+            median = stats['time_to_clear_median_s']
+            print(f"  {stage:>5} {stats['attempts']:>5} {stats['clear_rate'] * 100:>5.0f}% "
+                  f"{mean if mean is not None else float('nan'):>7.1f} {median if median is not None else float('nan'):>7.1f}  " +
+                  " ".join(f"{stats['deaths'].get(cause, 0):>7}" for cause in causes) + f" {stats['timeouts']:>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        metavar="NAME=V1,V2,...", help=f"変える定数と値（{', '.join(TUNABLE)}）")
+    parser.add_argument("--episodes", type=int, default=20, help="組み合わせごとのエピソード数（シード 0〜N-1）")
+    parser.add_argument("--frames", type=int, default=FPS * 60 * 5, help="1エピソードの最大フレーム数")
+    parser.add_argument("--policy", default="evasive", choices=["evasive", "dash"], help="台本（simulate.POLICIES）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="プロセス数（既定は全コア）")
+    parser.add_argument("--out", default="sweep.jsonl", help="エピソードごとの結果を書き出すファイル")
+    parser.add_argument("--resume", action="store_true", help="--out に既にある組み合わせ・シードは飛ばして追記する")
+    parser.add_argument("--summary", help="集計結果を書き出すJSONファイル")
+    parser.add_argument("--aggregate", metavar="JSONL", help="実行せず、既存の結果ファイルを集計するだけ")
+    args = parser.parse_args()
+
+    if args.aggregate:
+        summary = aggregate(load_results(args.aggregate))
+    else:
+        names = [name for name, _ in args.param]
+        grid = [dict(zip(names, values)) for values in itertools.product(*(values for _, values in args.param))]
+        tasks = [(params, seed, args.frames, args.policy) for params in grid for seed in range(args.episodes)]
+
+        done = set()
+        if args.resume and os.path.exists(args.out):
+            done = {(episode.get('policy'), params_key(episode['params']), episode['seed'])
+                    for episode in load_results(args.out)}
+        tasks = [task for task in tasks if (task[3], params_key(task[0]), task[1]) not in done]
+        print(f"{len(grid)} parameter sets x {args.episodes} episodes: {len(tasks)} to run on {args.workers} workers")
+
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        with open(args.out, "a" if args.resume else "w", encoding="utf-8") as out, \
+                context.Pool(args.workers, initializer=init_worker) as pool:
+            for i, episode in enumerate(pool.imap_unordered(run_episode, tasks), 1):
+                out.write(json.dumps(episode) + "\n")
+                out.flush()
+                print(f"\r{i}/{len(tasks)} episodes ({time.perf_counter() - start:.0f}s)", end="", file=sys.stderr)
+            # with を抜けると terminate() になり、キューを待っているワーカーの join で止まることがあるので先に閉じる
+            pool.close()
+            pool.join()
+        print(file=sys.stderr)
+        summary = aggregate(load_results(args.out))
+
+    print_summary(summary)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(list(summary.values()), f, indent=2)
+        print(f"-> {args.summary}")
+
+if __name__ == "__main__":
+    main()
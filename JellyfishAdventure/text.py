@@ -0,0 +1,106 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+class TextCache:
+    """文字列を描いたSurfaceを使い回すキャッシュ
+
+    (フォント, 文字列, アンチエイリアス, 色) をキーにして Font.render を一度だけ行う。
+    日本語のラスタライズは重いので、毎フレーム同じ文字を描く場面で効く。
+    上限を超えたら最も古く使われたものから捨てる（LRU）。
+    返すSurfaceは共有物なので、呼び出し側で描き込まないこと。
+    """
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, make):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = make()
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return entry
+
+    def render(self, font, text, color, antialias=True):
+        """font.render(text, antialias, color) と同じSurfaceを返す"""
+        key = (font, text, antialias, tuple(color))
+        return self.lookup(key, lambda: font.render(text, antialias, color))
+
+    def render_lines(self, font, lines, color, antialias=True, line_height=None, max_width=None):
+        """複数行を1枚のSurfaceにまとめて描く（会話ボックス用）
+
+        lines は文字列のリストか、改行を含む文字列。
+        max_width を指定すると、はみ出す行を文字単位で折り返す。
+        line_height を省略したらフォントの行の高さを使う。
+        """
+        if isinstance(lines, str):
+            lines = lines.split("\n")
+        key = ('lines', font, tuple(lines), antialias, tuple(color), line_height, max_width)
+        return self.lookup(key, lambda: self.layout(font, lines, color, antialias, line_height, max_width))
+
+    def layout(self, font, lines, color, antialias, line_height, max_width):
+        if max_width is not None:
+            lines = [wrapped for line in lines for wrapped in wrap_text(font, line, max_width)]
+        if line_height is None:
+            line_height = font.get_linesize()
+        rendered = [self.render(font, line, color, antialias) for line in lines]
+        width = max((surface.get_width() for surface in rendered), default=0)
+        height = line_height * (len(rendered) - 1) + rendered[-1].get_height() if rendered else 0
+        block = pygame.Surface((width, height), pygame.SRCALPHA)
+        block.blits([(surface, (0, i * line_height)) for i, surface in enumerate(rendered)], doreturn=False)
+        return block
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+def wrap_text(font, text, max_width):
+    """max_width に収まるように文字単位で折り返した行のリストを返す（日本語は空白で区切れないため）"""
+    lines = []
+    line = ""
+    for char in text:
+        if line and font.size(line + char)[0] > max_width:
+            lines.append(line)
+            line = char.lstrip()
+        else:
+            line += char
+    lines.append(line)
+    return lines
+
+class TextLabel:
+    """値が変わったときだけ描き直すHUDの文字（"ステージ {}" など）"""
+    def __init__(self, font, template, color, cache=None):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.cache = cache or text_cache
+        self.value = None
+        self.surface = None
+
+    def render(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = self.cache.render(self.font, self.template.format(value), self.color)
+        return self.surface
+
+# 画面の文字すべてで共有するキャッシュ
+text_cache = TextCache()